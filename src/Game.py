@@ -1,14 +1,17 @@
 from abc import ABC, abstractmethod
 
 # An interface implemented in Python that forms a solid blueprint for any game to be developed
+# Sprites are created by the thousand during training, so each one declares __slots__ instead of carrying a dictionary around
 class Game(ABC):
+    __slots__ = ()
 
     # An abstract method that will draw the sprite onto the game window
+    # Alpha is how far the game is between its previous and current simulation step (0 to 1), so the sprite can be drawn in between
     @abstractmethod
-    def draw(self, window):
+    def draw(self, window, alpha=1):
         pass
     
-    # An abstract method that will move the sprite
+    # An abstract method that will move the sprite by one simulation step
     @abstractmethod
     def move(self):
         pass
\ No newline at end of file
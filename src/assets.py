@@ -0,0 +1,87 @@
+# Import required libraries
+import os
+import random
+from os.path import dirname, abspath
+
+import pygame
+
+IMGS_PATH = os.path.join(dirname(dirname(abspath(__file__))), "imgs") # The folder the images are loaded from
+BACKGROUNDS = ["bg.png", "bg_night.jpeg"] # The backgrounds the game picks from; any that are missing are skipped
+DEFAULT_FONT = "comicsans" # The font every piece of text is written in
+WHITE = (255, 255, 255) # The colour every piece of text is written in
+
+IMAGES = {} # The images loaded so far, keyed by (file name, flipped)
+MASKS = {} # The masks built so far, keyed by (file name, flipped)
+FONTS = {} # The fonts created so far, keyed by (name, size)
+TEXTS = {} # The text rendered so far, keyed by (text, size, colour)
+TEXT_CACHE_SIZE = 256 # Scores and generations change as the game goes on, so only this many pieces of text are kept
+BACKGROUND = [] # The background picked for this run, once it has been picked
+
+# Nothing is loaded when this module (or a sprite module) is imported: every image, mask and font is only created the first time it is used,
+# and then kept for the rest of the run. Simulation-only processes (e.g. training workers) never touch the display, and never load a
+# background or a font at all.
+
+# Returns the image with the given file name, doubled in size (and flipped upside down if asked), loading it the first time it is asked for
+def image(name, flip=False):
+    key = (name, flip)
+    img = IMAGES.get(key)
+    if img is None:
+        if flip:
+            img = pygame.transform.flip(image(name), False, True)
+        else:
+            img = pygame.transform.scale2x(pygame.image.load(os.path.join(IMGS_PATH, name)))
+        IMAGES[key] = img
+    return img
+
+# Returns the mask of the image with the given file name, built the first time it is asked for
+def mask(name, flip=False):
+    key = (name, flip)
+    img_mask = MASKS.get(key)
+    if img_mask is None:
+        img_mask = MASKS[key] = pygame.mask.from_surface(image(name, flip))
+    return img_mask
+
+# Returns the background of the game, picked at random (once per run) from the backgrounds that are actually there
+def background():
+    if not BACKGROUND:
+        available = [name for name in BACKGROUNDS if os.path.exists(os.path.join(IMGS_PATH, name))]
+        BACKGROUND.append(image(random.choice(available)))
+    return BACKGROUND[0]
+
+# Returns the font with the given size, creating it the first time it is asked for
+def font(size, name=DEFAULT_FONT):
+    key = (name, size)
+    text_font = FONTS.get(key)
+    if text_font is None:
+        pygame.font.init()
+        text_font = FONTS[key] = pygame.font.SysFont(name, size)
+    return text_font
+
+# Returns the text rendered in the given size and colour, rendering it the first time it is asked for
+def text(string, size, colour=WHITE):
+    key = (string, size, colour)
+    surface = TEXTS.get(key)
+    if surface is None:
+        # Forget the oldest text once the cache is full
+        if len(TEXTS) >= TEXT_CACHE_SIZE:
+            del TEXTS[next(iter(TEXTS))]
+        surface = TEXTS[key] = font(size).render(string, 1, colour)
+    return surface
+
+# A LazyAsset is a class attribute (e.g. Bird.ASSETS) that is only loaded the first time it is read.
+# Once loaded, it replaces itself with the loaded value, so reading the attribute afterwards costs exactly as much as any other class attribute.
+class LazyAsset:
+
+    # The constructor for the LazyAsset class, with the function that loads the asset as an explicit parameter
+    def __init__(self, load):
+        self.load = load
+
+    # Remembers which class and attribute name the asset was assigned to
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, instance, owner):
+        value = self.load()
+        setattr(self.owner, self.name, value)
+        return value
@@ -0,0 +1,17 @@
+# Import required libraries
+import contextlib
+import os
+
+# Opens path for writing (in the given mode, with open or any opener taking a path and a mode, e.g. gzip.open) under a temporary name,
+# and renames the file to path once the with block has written all of it. A crash or an exception while writing therefore never
+# leaves a half-written file under the real name: the previous file (if any) is kept, and the temporary file is removed.
+@contextlib.contextmanager
+def atomic_write(path, mode="wb", opener=open):
+    temp_path = path + ".tmp"
+    try:
+        with opener(temp_path, mode) as f:
+            yield f
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
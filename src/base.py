@@ -1,31 +1,30 @@
 # Import required libraries
-import pygame
-import os
-from os.path import dirname, abspath
-
 from Game import Game
-
-imgs_path = dirname(dirname(abspath(__file__)))
-
-GROUND_ASSET = pygame.transform.scale2x(pygame.image.load(os.path.join(imgs_path, "imgs", "ground.png"))) # Load in required images and double their size
+import assets
+from assets import LazyAsset
 
 # A Base class to make the creation and handling of the base (i.e. ground) and its behavior easier and more efficient using OOP
 class Base(Game):
+    __slots__ = ("y", "x1", "x2", "prev_x1", "prev_x2")
     VELOCITY = 5 # The velocity of the moving base, which is equal to that of the pipes
-    WIDTH = GROUND_ASSET.get_width() # THe width of the base
-    IMG = GROUND_ASSET # Alias for the image of the base
+    WIDTH = LazyAsset(lambda: Base.IMG.get_width()) # THe width of the base
+    IMG = LazyAsset(lambda: assets.image("ground.png")) # The image of the base, loaded (doubled in size) the first time a base needs it
 
     # The constructor for the Base class, with the object passed as an implicit paramater.
     def __init__(self):
         self.y = 730 # The y-position of the base
         self.x1 = 0 # The x position of the first base
         self.x2 = self.WIDTH # The x position of the second base, directly behind the first
+        self.prev_x1 = self.x1 # The x positions of both bases before their last move, used to draw them in between simulation steps
+        self.prev_x2 = self.x2
 
     # A method that actually moves each base in order to give the appearance of an infinite scroller.
     # There are two bases, each the width of the game window. As one moves to the left, so does the other one.
     # When a base is completely off-screen, it is pushed behind the second and 'recycled'.
     # This process continues to repeat while the game is running.
     def move(self):
+        self.prev_x1 = self.x1
+        self.prev_x2 = self.x2
         self.x1 -= self.VELOCITY # Move the first base to the left at the specified velocity
         self.x2 -= self.VELOCITY # Move the second base to the left at the specified velocity
 
@@ -38,6 +37,15 @@ class Base(Game):
             self.x2 = self.x1 + self.WIDTH
     
     # Draw both bases onto the game window to ensure it appears as an infinite scroller.
-    def draw(self, window):
-        window.blit(self.IMG, (self.x1, self.y))
-        window.blit(self.IMG, (self.x2, self.y))
\ No newline at end of file
+    # Each base is drawn in between its previous and current position, except right after it was recycled to the back
+    # Returns the rectangle of the window that was drawn to
+    def draw(self, window, alpha=1):
+        first = window.blit(self.IMG, (self.interpolate(self.prev_x1, self.x1, alpha), self.y))
+        second = window.blit(self.IMG, (self.interpolate(self.prev_x2, self.x2, alpha), self.y))
+        return first.union(second)
+
+    # Returns the position in between prev_x and x, or just x if the base jumped there by being recycled
+    def interpolate(self, prev_x, x, alpha):
+        if x > prev_x:
+            return x
+        return prev_x + (x - prev_x) * alpha
\ No newline at end of file
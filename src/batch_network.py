@@ -0,0 +1,105 @@
+# Import required libraries
+import numpy as np
+from neat import activations, aggregations
+
+from model import ACTIVATIONS
+
+# Vectorised versions of NEAT's built-in activation functions, which work on a whole array of node inputs at once (see model.ACTIVATIONS),
+# keyed by the function objects that neat.nn.FeedForwardNetwork holds for each node
+VECTORISED_ACTIVATIONS = {getattr(activations, name + "_activation"): activation for name, activation in ACTIVATIONS.items()}
+
+# A BatchNetwork class that evaluates a whole generation of feed-forward networks at once.
+# Every network is padded to the same shape: its nodes are grouped by depth (the longest path from an input), and
+# for each depth there is one weight matrix per network mapping all node values to the nodes at that depth.
+# One activation then takes a single NumPy evaluation per depth for the whole population, instead of one Python graph walk per bird.
+# Networks using an aggregation other than sum, or a custom activation function, cannot be padded; they fall back to their own activate().
+class BatchNetwork:
+
+    # The constructor for the BatchNetwork class, with the list of neat.nn.FeedForwardNetworks to compile as an explicit parameter
+    def __init__(self, neural_networks):
+        self.neural_networks = neural_networks # The original networks, kept for the ones that need to fall back to activate()
+        self.size = len(neural_networks) # The number of networks in the batch
+        self.num_inputs = len(neural_networks[0].input_nodes) # Every network of a generation has the same inputs...
+        self.num_outputs = len(neural_networks[0].output_nodes) # ...and the same outputs
+
+        self.fallback = [] # The indices of the networks that are evaluated with their own activate()
+        activation_ids = {} # Each distinct vectorised activation function gets an id, used to apply it to the right nodes
+
+        # First, lay out every network: each input and each evaluated node gets a slot in that network's value row
+        layouts = []
+        for neural_network in neural_networks:
+            slots = {key: slot for slot, key in enumerate(neural_network.input_nodes)}
+            depths = {key: 0 for key in neural_network.input_nodes}
+            nodes = [] # (depth, slot, activation id, bias, response, links) for every evaluated node
+            for node, act_func, agg_func, bias, response, links in neural_network.node_evals:
+                if agg_func is not aggregations.sum_aggregation or act_func not in VECTORISED_ACTIVATIONS:
+                    self.fallback.append(len(layouts))
+                    nodes = []
+                    break
+                slots[node] = len(slots)
+                depths[node] = 1 + max((depths[i] for i, _ in links), default=0) # A node can be evaluated once all of its inputs are
+                act_id = activation_ids.setdefault(act_func, len(activation_ids))
+                nodes.append((depths[node], slots[node], act_id, bias, response, [(slots[i], w) for i, w in links]))
+            layouts.append((slots, nodes))
+
+        depth = max((n[0] for _, nodes in layouts for n in nodes), default=0) # The number of layers to evaluate
+        num_slots = max(len(slots) for slots, _ in layouts)
+        self.zero_slot = num_slots # A value that is always 0, read by outputs that are never evaluated (as in activate())
+        self.sink_slot = num_slots + 1 # Padding nodes write their (meaningless) value here
+        self.num_slots = num_slots + 2
+        self.activations = [None] * len(activation_ids) # The vectorised activation function for each id
+        for act_func, act_id in activation_ids.items():
+            self.activations[act_id] = VECTORISED_ACTIVATIONS[act_func]
+
+        # Then pad every layer to the widest network at that depth
+        self.layers = []
+        for d in range(1, depth + 1):
+            width = max(sum(1 for n in nodes if n[0] == d) for _, nodes in layouts)
+            weights = np.zeros((self.size, width, self.num_slots))
+            bias = np.zeros((self.size, width))
+            response = np.zeros((self.size, width))
+            targets = np.full((self.size, width), self.sink_slot, dtype=np.int64)
+            act_ids = np.zeros((self.size, width), dtype=np.int64)
+            for p, (_, nodes) in enumerate(layouts):
+                for m, (_, slot, act_id, node_bias, node_response, links) in enumerate(n for n in nodes if n[0] == d):
+                    for i, w in links:
+                        weights[p, m, i] += w
+                    bias[p, m] = node_bias
+                    response[p, m] = node_response
+                    targets[p, m] = slot
+                    act_ids[p, m] = act_id
+            self.layers.append((weights, bias, response, targets, act_ids))
+
+        # The slot of every output of every network
+        self.outputs = np.array([[slots.get(key, self.zero_slot) for key in neural_network.output_nodes]
+                                 for neural_network, (slots, _) in zip(neural_networks, layouts)], dtype=np.int64)
+
+    # Activates the networks selected by rows (all of them by default) on their inputs, one row of inputs per network.
+    # Returns one row of outputs per selected network, in the same order as rows.
+    def activate(self, inputs, rows=None):
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if rows is None:
+            rows = np.arange(self.size)
+        values = np.zeros((len(rows), self.num_slots))
+        values[:, :self.num_inputs] = inputs
+
+        for weights, bias, response, targets, act_ids in self.layers:
+            targets = targets[rows]
+            act_ids = act_ids[rows]
+            z = bias[rows] + response[rows] * np.einsum("pms,ps->pm", weights[rows], values)
+            # Apply each activation function to the nodes that use it
+            for act_id, activation in enumerate(self.activations):
+                mask = act_ids == act_id
+                if len(self.activations) == 1:
+                    z = activation(z)
+                elif mask.any():
+                    z[mask] = activation(z[mask])
+            np.put_along_axis(values, targets, z, axis=1)
+
+        outputs = np.take_along_axis(values, self.outputs[rows], axis=1)
+
+        # The networks that could not be padded are evaluated one by one
+        for i in self.fallback:
+            for r in np.flatnonzero(rows == i):
+                outputs[r] = self.neural_networks[i].activate(inputs[r])
+        return outputs
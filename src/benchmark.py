@@ -0,0 +1,219 @@
+"""
+Measures how fast the game simulates, detects collisions, runs the neural networks and draws, for populations of different sizes.
+It runs headless (with SDL's dummy video driver) so it works on a CPU-only Linux box, and writes its results as JSON so runs can be compared.
+
+    python benchmark.py --sizes 10 100 1000 10000 --output bench.json
+"""
+
+# Import required libraries
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Must be set before pygame opens a display
+import argparse
+import json
+import platform
+import random
+import tempfile
+import time
+
+import numpy as np
+import pygame
+import neat
+
+from bird import Bird
+from pipe import Pipe
+from world import World, WIN_WIDTH, WIN_LENGTH
+from flock import Flock
+from batch_network import BatchNetwork
+from sensors import Sensors
+from profiling import Profiler
+
+# Runs fn once per frame for the given number of frames and returns the time taken in seconds
+def time_frames(fn, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return time.perf_counter() - start
+
+# Builds a result entry with the throughput figures shared by every benchmark
+def result(benchmark, backend, population, frames, seconds):
+    return {
+        "benchmark": benchmark,
+        "backend": backend,
+        "population": population,
+        "frames": frames,
+        "seconds": seconds,
+        "frames_per_sec": frames / seconds if seconds > 0 else None,
+        "bird_frames_per_sec": population * frames / seconds if seconds > 0 else None,
+    }
+
+# A profiler that only counts the frames of the game loops (one per simulation step when training headless), without timing any phase
+class StepCounter(Profiler):
+
+    def __init__(self):
+        super().__init__(enabled=False)
+        self.steps = 0 # The number of frames ended so far
+
+    def end_frame(self):
+        self.steps += 1
+
+# Returns n birds spread over the screen, each having jumped at a different moment, so they cover every tilt and animation frame
+def scattered_birds(n, rng):
+    birds = []
+    for _ in range(n):
+        bird = Bird(230, rng.uniform(100, 600))
+        for _ in range(rng.randrange(30)):
+            bird.move()
+            bird.animate()
+        bird.y = rng.uniform(100, 600)
+        birds.append(bird)
+    return birds
+
+# Bird.move one bird at a time, and the vectorised Flock.move for the whole population at once
+def bench_move(n, frames):
+    birds = [Bird(230, 350) for _ in range(n)]
+    def move_birds():
+        for bird in birds:
+            bird.move()
+            if bird.tick_count > 20:
+                bird.jump()
+    flock = Flock(n)
+    def move_flock():
+        flock.move()
+        flock.jump(flock.tick_count > 20)
+    return [result("move", "bird", n, frames, time_frames(move_birds, frames)),
+            result("move", "flock", n, frames, time_frames(move_flock, frames))]
+
+# Pipe.collide for every bird against a pipe level with the birds, one bird at a time and for the whole flock
+def bench_collide(n, frames, rng):
+    pipe = Pipe(WIN_WIDTH, 250)
+    pipe.x = 230 # Level with the birds, so the bounding boxes overlap and the pixel test runs
+    birds = scattered_birds(n, rng)
+    flock = Flock(n)
+    flock.y = np.array([bird.y for bird in birds])
+    return [result("collide", "bird", n, frames, time_frames(lambda: [pipe.collide(bird) for bird in birds], frames)),
+            result("collide", "flock", n, frames, time_frames(lambda: flock.collide(pipe), frames))]
+
+# FeedForwardNetwork.activate for every bird, and BatchNetwork for the whole population at once
+def bench_activate(n, frames, config, rng):
+    genomes = new_genomes(n, config)
+    neural_networks = [neat.nn.FeedForwardNetwork.create(g, config) for g in genomes]
+    batch_network = BatchNetwork(neural_networks)
+    # Only the timing matters, so any sensors beyond the default three just read random values too
+    extra = config.genome_config.num_inputs - 3
+    inputs = np.array([[rng.uniform(0, 700), rng.uniform(0, 400), rng.uniform(0, 400)] + [rng.uniform(-1, 1) for _ in range(extra)] for _ in range(n)])
+    input_rows = inputs.tolist()
+    def activate_each():
+        for neural_network, row in zip(neural_networks, input_rows):
+            neural_network.activate(row)
+    return [result("activate", "feed_forward", n, frames, time_frames(activate_each, frames)),
+            result("activate", "batch", n, frames, time_frames(lambda: batch_network.activate(inputs), frames))]
+
+# draw_window with n birds on screen, redrawing the whole window every frame and only the regions that changed
+def bench_draw(n, frames, rng):
+    import flappybird_game # Imported here since it loads the fonts and the background
+    from renderer import Renderer
+    window = pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH))
+    world = World(n, 0)
+    world.birds = scattered_birds(n, rng)
+    results = []
+    for implementation, dirty in (("full", False), ("dirty", True)):
+        renderer = Renderer(window, dirty)
+        results.append(result("draw_window", implementation, n, frames,
+                              time_frames(lambda: flappybird_game.draw_window(renderer, world.birds, world.pipes, world.base, 0, 1), frames)))
+    return results
+
+# The wall time of whole generations of training, in lock-step with Bird objects and with the vectorised flock
+def bench_generation(n, generations, config):
+    import flappybird_game
+    flappybird_game.HEADLESS_TRAINING = True
+    config.course_seed = 0
+    # A benchmark genome that happens to be invincible is saved like any other, so it must not replace the bird flown in the LEARN mode
+    model_path = flappybird_game.MODEL_PATH
+    profiler = flappybird_game.PROFILER
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        flappybird_game.MODEL_PATH = os.path.join(folder, "best_bird.fbm")
+        try:
+            for backend, vectorised in (("world", False), ("flock", True)):
+                flappybird_game.VECTORISED_TRAINING = vectorised
+                flappybird_game.PROFILER = counter = StepCounter() # Counts the steps actually simulated
+                seconds = 0
+                for g in range(generations):
+                    genomes = list(enumerate(new_genomes(n, config, seed=g)))
+                    start = time.perf_counter()
+                    flappybird_game.gen_training(genomes, config)
+                    seconds += time.perf_counter() - start
+                entry = result("generation", backend, n, counter.steps, seconds)
+                entry["generations"] = generations
+                entry["seconds_per_generation"] = seconds / generations
+                results.append(entry)
+        finally:
+            flappybird_game.MODEL_PATH = model_path
+            flappybird_game.PROFILER = profiler
+    return results
+
+# Creates n brand new genomes, as in the first generation of a run
+def new_genomes(n, config, seed=0):
+    random.seed(seed) # NEAT draws the initial weights from the global random module
+    genomes = []
+    for key in range(n):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        genomes.append(genome)
+    return genomes
+
+# Runs the requested benchmarks for every population size and returns the report
+def run_benchmarks(sizes, frames, generations, config_file, benchmarks):
+    pygame.init()
+    rng = random.Random(0)
+    config = None
+    if os.path.exists(config_file):
+        config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
+        Sensors.from_file(config_file).configure(config)
+    else:
+        print("No NEAT config at {0}: skipping the activate and generation benchmarks".format(config_file))
+
+    results = []
+    for n in sizes:
+        print("Population of {0}...".format(n))
+        if "move" in benchmarks:
+            results += bench_move(n, frames)
+        if "collide" in benchmarks:
+            results += bench_collide(n, frames, rng)
+        if "activate" in benchmarks and config is not None:
+            results += bench_activate(n, frames, config, rng)
+        if "draw" in benchmarks:
+            results += bench_draw(n, frames, rng)
+        if "generation" in benchmarks and config is not None:
+            results += bench_generation(n, generations, config)
+
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "neat": getattr(neat, "__version__", None),
+            "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+            "frames": frames,
+        },
+        "results": results,
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the Flappy Bird simulation, collisions, inference and drawing")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000], help="the population sizes to measure")
+    parser.add_argument("--frames", type=int, default=100, help="the frames timed by each per-frame benchmark")
+    parser.add_argument("--generations", type=int, default=1, help="the generations timed by the generation benchmark")
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "neatconfig.txt"), help="the NEAT config file")
+    parser.add_argument("--only", nargs="+", default=["move", "collide", "activate", "draw", "generation"], help="the benchmarks to run")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.frames, args.generations, args.config, args.only)
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
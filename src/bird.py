@@ -1,28 +1,30 @@
 # Import required libraries
 import pygame
-import os
-from os.path import dirname, abspath
 
 from Game import Game
-# Load in required images and double their size
-imgs_path = dirname(dirname(abspath(__file__)))
+import assets
+from assets import LazyAsset
 
-BIRD_ASSETS = [
-    pygame.transform.scale2x(pygame.image.load(os.path.join(imgs_path, "imgs", "bird1.png"))),
-    pygame.transform.scale2x(pygame.image.load(os.path.join(imgs_path, "imgs", "bird2.png"))),
-    pygame.transform.scale2x(pygame.image.load(os.path.join(imgs_path, "imgs", "bird3.png")))
-]
+BIRD_IMAGES = ["bird1.png", "bird2.png", "bird3.png"] # The images of the bird's flapping animation
 # A Bird class to make the creation and handling of the bird and its behavior easier and more efficient using OOP
 class Bird(Game):
-    ASSETS = BIRD_ASSETS # All the images of the bird
+    __slots__ = ("x", "y", "prev_y", "tilt", "tick_count", "velocity", "height", "img_count", "img")
+    ASSETS = LazyAsset(lambda: [assets.image(name) for name in BIRD_IMAGES]) # All the images of the bird, loaded (doubled in size) the first time a bird needs them
+    MASKS = LazyAsset(lambda: [assets.mask(name) for name in BIRD_IMAGES]) # The mask of each image of the bird, built once since the images never change
     MAX_ROTATION = 25 # The angle of tilt of the bird when it moves up and down (image is rotated 25 degrees)
     ROTATION_VEL = 20 # How much the bird will be rotated per frame (i.e. every time it moves)
     ANIMATION_TIME = 5 # How long each bird animation will be shown (i.e. how fast it is flapping its wings)
+    TERMINAL_VELOCITY = 16 # The maximum velocity of the bird
+    GRAVITY = 3 # The acceleration the bird experiences due to gravity
+    JUMP_VELOCITY = -10.5 # The velocity of the bird right after it jumps
+    ROTATION_CACHE = {} # The rotated images shared by every bird, keyed by (image number, tilt), with the offset that keeps them centred
+    ROTATION_CACHE_SIZE = 64 # The tilt only takes a handful of values, so the cache never needs to hold more than this
 
     # The constructor for the Bird class, with 2 explicit parameters x and y and the object passed as an implicit paramater.
     def __init__(self, x, y):
         self.x = x # The initial x-coordinate of the bird.
         self.y = y # The initial y-coordinate of the bird.
+        self.prev_y = y # The y-coordinate of the bird before its last move, used to draw it in between simulation steps.
         self.tilt = 0 # The initial tilt of the bird - 0 since it's looking straight ahead.
         self.tick_count = 0 # Tick count is used to determine when the bird last jumped. It represented how long the bird has been moving which is used in determining the velocity and direction of the bird.
         self.velocity = 0 # The initial velocity of the bird.
@@ -32,29 +34,28 @@ class Bird(Game):
 
     # This method makes the bird 'jump' i.e. move up on the screen
     def jump(self):
-        self.velocity = -10.5 # In order to move up, the velocity has to be negative, as (0,0) is located at the top-left
+        self.velocity = self.JUMP_VELOCITY # In order to move up, the velocity has to be negative, as (0,0) is located at the top-left
         self.tick_count = 0 # Since bird has jumped, reset tick_count
         self.height = self.y # Set the current height of the bird as its current y-coordinate
     
     # This method makes the bird actually move and handles the physics
     def move(self):
-        TERMINAL_VELOCITY = 16 # The maximum velocity of the bird
-        GRAVITY = 3 # The acceleration the bird experiences due to gravity
         self.tick_count += 1 # Increment tick_count since a frame went by and the bird moved without jumping
-        displacement = self.velocity * self.tick_count + 0.5 * GRAVITY * (self.tick_count ** 2) # The number of pixels moved up or down in this frame
+        displacement = self.velocity * self.tick_count + 0.5 * self.GRAVITY * (self.tick_count ** 2) # The number of pixels moved up or down in this frame
         # Displacement calculation comes from the kinematics equation, Δd = viΔt + 0.5a(Δt^2)
         # Based on the current velocity and how much time has passed since its last jump, we can compute the vertical displacement.
         # Allows us to get a parabolic trajectory on the bird to emulate realism
 
         # If the amount of pixels in the vertical displacement is greater than the terminal velocity permits, set the displacement to the terminal velocity. 
-        if displacement >= TERMINAL_VELOCITY:
-            displacement = TERMINAL_VELOCITY
+        if displacement >= self.TERMINAL_VELOCITY:
+            displacement = self.TERMINAL_VELOCITY
         
         # If the displacement is negative (i.e. moving upwards), moves the bird slightly higher in order to fine-tune the movement
         if displacement < 0:
             displacement -= 2
         
         # Increment the current y-position of the bird by the displacement. 
+        self.prev_y = self.y
         self.y += displacement
 
         # If the displacement is negative (i.e. moving upwards) or the bird's position is above its initial jump position, tilt the bird upwards
@@ -70,7 +71,9 @@ class Bird(Game):
                 # The bird gradually tilts more and more downwards until it is facing 90 degrees from its original position
                 self.tilt -= self.ROTATION_VEL
     
-    def draw(self, window):
+    # This method advances the flapping animation by one simulation step
+    # It is part of the simulation rather than of draw, since the image shown is also the one used for collisions
+    def animate(self):
         self.img_count += 1 # Keeps track of the amount of ticks an image has been shown for
 
         # This section chooses which bird image to display based on how long the previous image has been shown for to produce a smooth flapping animation. 
@@ -91,13 +94,30 @@ class Bird(Game):
         if self.tilt <= -80:
             self.img = self.ASSETS[1] # Set the current bird image to the image with the wings at its side
             self.img_count = self.ANIMATION_TIME * 2 # This ensures that when the flapping animation resumes, it's a smooth transition between image 2 and 3
-    
-        # This section actually rotates the bird image from the specified angle of tilt
-        # Since Pygame rotates about the top-left corner, additional code is required to rotate about the center of the bird
-        rotated_img = pygame.transform.rotate(self.img, self.tilt)
-        new_rect = rotated_img.get_rect(center = self.img.get_rect(topleft = (self.x, self.y)).center)
-        window.blit(rotated_img, new_rect.topleft)
 
-    # A method that stores a 2-Dimensional list of the location of all the pixels of an image
+    # Draws the bird image rotated by the specified angle of tilt, in between its previous and current position
+    # Returns the rectangle of the window that was drawn to
+    def draw(self, window, alpha=1):
+        y = self.prev_y + (self.y - self.prev_y) * alpha # Interpolate between the last two simulation steps
+        rotated_img, offset = self.get_rotated_img()
+        new_rect = self.img.get_rect(topleft = (self.x, y))
+        return window.blit(rotated_img, (new_rect.x + offset[0], new_rect.y + offset[1]))
+
+    # Returns the current image rotated by the current tilt, along with the offset from the unrotated image's top-left corner to draw it at
+    # Since Pygame rotates about the top-left corner, the offset is what makes the bird rotate about its center instead
+    # Rotating allocates a new surface, so each (image, tilt) pair is only rotated once and then shared by every bird
+    def get_rotated_img(self):
+        key = (self.ASSETS.index(self.img), self.tilt)
+        cached = self.ROTATION_CACHE.get(key)
+        if cached is None:
+            rotated_img = pygame.transform.rotate(self.img, self.tilt)
+            cached = (rotated_img, rotated_img.get_rect(center = self.img.get_rect().center).topleft)
+            # The cache is bounded in case the tilt rules are ever changed to produce many more angles
+            if len(self.ROTATION_CACHE) < self.ROTATION_CACHE_SIZE:
+                self.ROTATION_CACHE[key] = cached
+        return cached
+
+    # A method that returns a 2-Dimensional list of the location of all the pixels of the current image
+    # The collision uses the unrotated image, so there is exactly one (prebuilt) mask per animation frame
     def get_mask(self):
-        return pygame.mask.from_surface(self.img)
+        return self.MASKS[self.ASSETS.index(self.img)]
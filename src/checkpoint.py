@@ -0,0 +1,60 @@
+# Import required libraries
+import gzip
+import itertools
+import pickle
+import random
+from functools import partial
+import neat
+
+from atomic_file import atomic_write
+
+# An AtomicCheckpointer class that periodically saves the whole training run so it can be resumed after a crash or pre-emption.
+# It works like neat.Checkpointer (a checkpoint every generation_interval generations or time_interval_seconds, whichever comes first),
+# but each checkpoint is written under a temporary name and then renamed, so an interrupted save never leaves a corrupt file behind.
+# Besides the population, species, generation and random state, it also saves the game's own state (e.g. CUR_GEN) returned by get_state.
+class AtomicCheckpointer(neat.Checkpointer):
+
+    # The constructor for the AtomicCheckpointer class; get_state is a function returning a dictionary of extra state to save
+    def __init__(self, generation_interval=10, time_interval_seconds=300, filename_prefix="neat-checkpoint-", get_state=dict):
+        super().__init__(generation_interval, time_interval_seconds, filename_prefix)
+        self.get_state = get_state # Returns the game's own state to save alongside the population
+        self.last_generation_checkpoint = 0 # Generations are counted from 1 (see start_generation), so the first checkpoint still comes after generation_interval generations
+
+    # By the end of a generation, when neat.Checkpointer saves, the population has already been bred into the next generation.
+    # The checkpoint is labelled with that next generation, so a resumed run evaluates the population under its own number (as save_now does)
+    def start_generation(self, generation):
+        self.current_generation = generation + 1
+
+    # The species set keeps a reference to every reporter, so the checkpointer ends up inside its own checkpoints.
+    # The get_state function is left out of those copies, since it may not be picklable (e.g. a lambda).
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["get_state"] = dict
+        return state
+
+    # Saves the current state of the run atomically
+    def save_checkpoint(self, config, population, species_set, generation):
+        filename = "{0}{1}".format(self.filename_prefix, generation)
+        print("Saving checkpoint to {0}".format(filename))
+
+        with atomic_write(filename, "w", partial(gzip.open, compresslevel=5)) as f: # Only a complete checkpoint ever appears under the real name
+            data = (generation, config, population, species_set, random.getstate(), self.get_state())
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Saves the run as it is right now, e.g. when training is interrupted in the middle of a generation.
+    # The generation being evaluated has not been given its fitness yet, so it is simply run again when the checkpoint is resumed.
+    def save_now(self, population):
+        self.save_checkpoint(population.config, population.population, population.species, population.generation)
+
+    # Resumes a run from a checkpoint, restoring the random state.
+    # The genome keys carry on from the highest key in the population: a fresh neat.Population would number its children from 1 again,
+    # and a child given the key of a surviving elite would take its place.
+    # Returns the restored neat.Population and the dictionary of the game's own state.
+    @staticmethod
+    def restore_checkpoint(filename):
+        with gzip.open(filename) as f:
+            generation, config, population, species_set, random_state, state = pickle.load(f)
+        random.setstate(random_state)
+        restored = neat.Population(config, (population, species_set, generation))
+        restored.reproduction.genome_indexer = itertools.count(max(population) + 1)
+        return restored, state
@@ -0,0 +1,61 @@
+# Import required libraries
+import random
+import numpy as np
+
+DEFAULT_SEED = 0 # The seed of the pipe course used when none is given
+
+# A Course class that holds the heights of every pipe of one pipe course, generated from a seed.
+# The same seed always produces the same course, so fitness is comparable across generations, runs and worker processes.
+# The heights are precomputed in an array, and the array is extended (continuing the same random sequence) if a bird flies past its end.
+class Course:
+    LENGTH = 256 # The number of pipe heights precomputed at a time, comfortably more than an invincible bird needs
+    CACHE = {} # The courses built so far, keyed by seed, so identical seeds share the same course
+    CACHE_SIZE = 128 # The maximum number of courses kept in the cache
+
+    # The constructor for the Course class, with the seed of the course as an explicit parameter
+    def __init__(self, seed):
+        self.seed = seed # The seed the course was generated from
+        self.rng = random.Random(seed) # A private random generator, so the course does not depend on (or disturb) the global one
+        self.heights = np.empty(0, dtype=np.int64) # The height of every pipe of the course, in order
+        self.extend()
+
+    # Precomputes the heights of the next LENGTH pipes
+    def extend(self):
+        more = np.array([self.rng.randrange(50, 450) for _ in range(self.LENGTH)], dtype=np.int64) # A random number between 50 and 450, like the original pipes
+        self.heights = np.concatenate((self.heights, more))
+
+    # Returns the height of the pipe with the given index
+    def height(self, index):
+        while index >= len(self.heights):
+            self.extend()
+        return int(self.heights[index])
+
+    # Iterates over the heights of the pipes in order, e.g. Pipe(WIN_WIDTH, next(heights)) for each new pipe
+    def __iter__(self):
+        index = 0
+        while True:
+            yield self.height(index)
+            index += 1
+
+    # Returns the course generated from the seed, sharing it with everyone else who asked for the same seed
+    @classmethod
+    def get(cls, seed):
+        course = cls.CACHE.get(seed)
+        if course is None:
+            # Forget the oldest course once the cache is full
+            if len(cls.CACHE) >= cls.CACHE_SIZE:
+                del cls.CACHE[next(iter(cls.CACHE))]
+            course = cls.CACHE[seed] = cls(seed)
+        return course
+
+    # Returns the seeds of count different courses derived from seed: seed itself first, then count - 1 more generated from it
+    # A genome flown over all of them has to be good at flying, rather than just good at the one course it was trained on
+    @staticmethod
+    def seeds(seed, count):
+        rng = random.Random(seed)
+        return [seed] + [rng.randrange(2 ** 32) for _ in range(count - 1)]
+
+    # Returns a new random seed, for games that should get a fresh course every time they are played
+    @staticmethod
+    def random_seed():
+        return random.randrange(2 ** 32)
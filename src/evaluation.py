@@ -0,0 +1,115 @@
+# Import required libraries
+import heapq
+import neat
+
+from course import DEFAULT_SEED
+from sensors import Sensors, config_sensors
+from pipe import Pipe
+from world import World, MAX_SCORE, WIN_WIDTH, BIRD_X
+
+# A new pipe appears at the edge of the window when the last one is passed, and is passed once it has moved past the birds (checked before it moves),
+# so pipes are passed exactly every STEPS_PER_PIPE steps, however the birds fly
+STEPS_PER_PIPE = (WIN_WIDTH - BIRD_X) // Pipe.VELOCITY + 2
+AGGREGATES = {"mean": lambda fitnesses: sum(fitnesses) / len(fitnesses), "min": min} # The ways the fitness of several flights can be combined
+
+# Flies a single bird controlled by a neural network over the pipe course generated from the seed.
+# This is the same simulation as gen_training, step for step, but for one bird and without any window, clock or events.
+# Because the course is rebuilt from the seed, every genome (in any process) sees exactly the same obstacles.
+# The flight ends when the bird dies, passes more than max_score pipes or (if given) has flown max_steps steps.
+# The network reads the bird through the given sensors (the default sensors if none are given).
+# Returns a tuple of the fitness the bird earned and the number of pipes passed.
+def fly(neural_network, seed, max_score=MAX_SCORE, max_steps=None, sensors=None):
+    world = World(1, seed) # A world with a single bird
+    bird = world.birds[0]
+    fitness = 0 # The fitness of the bird, rewarded in the same way as in gen_training
+    sensors = Sensors() if sensors is None else sensors
+    inputs = [0.0] * sensors.size # The inputs of the network, refilled every step
+
+    # If the output of the network is greater than 0.5, make the bird jump
+    def think(next_pipe):
+        if neural_network.activate(sensors.read_into(inputs, bird, next_pipe, world.pipes))[0] > 0.5:
+            bird.jump()
+
+    while world.alive:
+        fitness += 0.1 # The bird is rewarded for every step it stays alive
+        crashed, passed, _ = world.step(think)
+
+        # Hitting a pipe is penalised, while passing one is rewarded, motivating the bird to make it as far as possible
+        if crashed:
+            fitness -= 1
+        elif passed:
+            fitness += 5
+
+        # The bird is invincible (or has used up its steps), so there is nothing more to learn from this flight
+        if world.score > max_score or (max_steps is not None and world.steps >= max_steps):
+            break
+
+    return fitness, world.score
+
+# Returns the most fitness a single flight could possibly earn: staying alive for every step it can last and passing every pipe it meets
+def max_fitness(max_score=MAX_SCORE, max_steps=None):
+    steps = (max_score + 1) * STEPS_PER_PIPE # The flight ends as the (max_score + 1)th pipe is passed
+    if max_steps is not None:
+        steps = min(steps, max_steps)
+    return 0.1 * steps + 5 * (steps // STEPS_PER_PIPE) + 1e-6 # Leaves room for the rounding of the fitness added up step by step
+
+# Flies a neural network over each of the courses generated from seeds and combines the fitness of the flights (by their mean or min).
+# If a threshold is given, the remaining courses are skipped as soon as the combined fitness can no longer reach it, even if every
+# remaining flight earned the most fitness possible; the fitness returned is then combined from the flights actually flown.
+# Returns a tuple of the combined fitness and the number of courses flown.
+def fly_courses(neural_network, seeds, aggregate="mean", max_score=MAX_SCORE, max_steps=None, threshold=None, sensors=None):
+    best_flight = max_fitness(max_score, max_steps)
+    fitnesses = [] # The fitness earned on each course flown so far
+    for seed in seeds:
+        fitness, _ = fly(neural_network, seed, max_score, max_steps, sensors)
+        fitnesses.append(fitness)
+
+        if threshold is not None and len(fitnesses) < len(seeds):
+            # The best combined fitness the genome could still end up with
+            if aggregate == "min":
+                best_possible = min(fitnesses)
+            else:
+                best_possible = (sum(fitnesses) + best_flight * (len(seeds) - len(fitnesses))) / len(seeds)
+            if best_possible < threshold:
+                break
+
+    return AGGREGATES[aggregate](fitnesses), len(fitnesses)
+
+# A MultiCourseEvaluator class that is a NEAT fitness function flying every genome over the courses named by the config (course_seeds).
+# Genomes are flown one after the other, and once top_k genomes have flown every course, a genome stops flying as soon as it can no longer
+# beat the top_k best of the generation so far. Hopeless genomes (most of them, early in a run) then only cost one or two courses.
+# A top_k of 0 flies every genome over every course.
+# The fitness of a genome that stopped early only counts the courses it flew, so it is not the fitness it would have earned over all of them.
+class MultiCourseEvaluator:
+
+    # The constructor for the MultiCourseEvaluator class, with the number of best genomes to compare against as an explicit parameter
+    def __init__(self, top_k=0):
+        self.top_k = top_k # The number of best genomes a genome has to be able to beat to keep flying
+        self.courses_flown = 0 # The number of flights made so far
+        self.courses_skipped = 0 # The number of flights skipped by stopping early
+        self.stopped_early = set() # The ids of the genomes of the last generation evaluated that stopped flying early
+
+    # Evaluates a generation of genomes, in the form expected by neat.Population.run
+    def evaluate(self, genomes, config):
+        seeds = getattr(config, "course_seeds", None) or [getattr(config, "course_seed", DEFAULT_SEED)]
+        aggregate = getattr(config, "fitness_aggregate", "mean")
+        max_steps = getattr(config, "max_course_steps", None)
+        sensors = config_sensors(config)
+        best = [] # A min-heap of the fitness of the top_k best genomes that flew every course
+        self.stopped_early = set()
+
+        for genome_id, genome in genomes:
+            # A genome only has to keep flying while it could still make it into the top_k
+            threshold = best[0] if self.top_k > 0 and len(best) >= self.top_k else None
+            neural_network = neat.nn.FeedForwardNetwork.create(genome, config)
+            genome.fitness, flown = fly_courses(neural_network, seeds, aggregate, max_steps=max_steps, threshold=threshold, sensors=sensors)
+            self.courses_flown += flown
+            self.courses_skipped += len(seeds) - flown
+            if flown < len(seeds):
+                self.stopped_early.add(genome_id)
+
+            if self.top_k > 0 and flown == len(seeds):
+                if len(best) < self.top_k:
+                    heapq.heappush(best, genome.fitness)
+                elif genome.fitness > best[0]:
+                    heapq.heapreplace(best, genome.fitness)
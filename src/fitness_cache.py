@@ -0,0 +1,94 @@
+# Import required libraries
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from atomic_file import atomic_write
+from sensors import Sensors, config_sensors
+
+# A FitnessCache class that remembers the fitness of genomes that have already flown a course.
+# NEAT carries elite genomes over to the next generation unchanged, and with a seeded course their flight is exactly the same,
+# so there is no need to simulate them again. Entries are keyed by the genome's node and connection genes plus the course seed,
+# the least recently used entries are forgotten once the cache is full, and the cache can optionally be backed by a file on disk.
+class FitnessCache:
+
+    # The constructor for the FitnessCache class, with the maximum number of entries and an optional backing file as explicit parameters
+    def __init__(self, max_size=4096, path=None):
+        self.max_size = max_size # The maximum number of fitnesses remembered
+        self.path = path # The file the cache is loaded from and saved to, if any
+        self.entries = OrderedDict() # The cached fitnesses, from least to most recently used
+        self.hits = 0 # The number of genomes whose flight was skipped
+        self.misses = 0 # The number of genomes that had to be simulated
+
+        # Pick up where a previous run left off
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                for key, fitness in json.load(f):
+                    self.put(key, fitness)
+
+    # Returns the cache key of a genome flying the course generated from seed.
+    # Only the genes that affect the neural network are hashed, so identical genomes with different ids share the same key.
+    @staticmethod
+    def genome_key(genome, seed):
+        nodes = sorted((key, node.bias, node.response, node.activation, node.aggregation) for key, node in genome.nodes.items())
+        connections = sorted((key, conn.weight, conn.enabled) for key, conn in genome.connections.items())
+        return hashlib.blake2b(repr((seed, nodes, connections)).encode(), digest_size=16).hexdigest()
+
+    # Returns the cached fitness for the key, or None if it is not in the cache
+    def get(self, key):
+        fitness = self.entries.get(key)
+        if fitness is not None:
+            self.entries.move_to_end(key) # The entry is now the most recently used
+        return fitness
+
+    # Stores the fitness for the key, forgetting the least recently used entry if the cache is full
+    def put(self, key, fitness):
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    # Writes the cache to its backing file, if it has one.
+    # The file is written atomically, so a crash never leaves a half-written cache behind.
+    def save(self):
+        if self.path is None:
+            return
+        with atomic_write(self.path, "w") as f:
+            json.dump(list(self.entries.items()), f)
+
+    # Wraps a NEAT fitness function (e.g. gen_training, or a ParallelEvaluator's evaluate) so cached genomes skip the simulation entirely.
+    # Only the genomes missing from the cache are passed on to the fitness function, and their new fitness is then cached.
+    # If the fitness function can stop evaluating a genome early (see MultiCourseEvaluator), stopped_early returns the ids of the genomes
+    # it stopped early in its last call; their fitness is only a partial one, which a later generation must not reuse, so it is not cached.
+    def wrap(self, fitness_function, stopped_early=None):
+        def cached_fitness_function(genomes, config):
+            # Several courses (with a step cap and a way of combining them) make a different fitness than the single course
+            seed = getattr(config, "course_seed", None)
+            if getattr(config, "course_seeds", None) is not None:
+                seed = (tuple(config.course_seeds), config.fitness_aggregate, config.max_course_steps)
+            # So do other sensors, but the default ones leave the keys of existing cache files unchanged
+            sensors = config_sensors(config)
+            if sensors != Sensors():
+                seed = (seed, sensors.names, sensors.normalise)
+            keys = {}
+            uncached = []
+            for genome_id, genome in genomes:
+                keys[genome_id] = self.genome_key(genome, seed)
+                fitness = self.get(keys[genome_id])
+                if fitness is None:
+                    uncached.append((genome_id, genome))
+                else:
+                    genome.fitness = fitness
+            self.hits += len(genomes) - len(uncached)
+            self.misses += len(uncached)
+
+            # Only the new genomes actually fly
+            if uncached:
+                fitness_function(uncached, config)
+                partial = stopped_early() if stopped_early is not None else ()
+                for genome_id, genome in uncached:
+                    if genome_id not in partial:
+                        self.put(keys[genome_id], genome.fitness)
+            self.save()
+        return cached_fitness_function
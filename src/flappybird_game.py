@@ -9,61 +9,80 @@ I hope you enjoy my reanimation of a classic game :D
 # Import required libraries
 import pygame
 import neat
-import time
 import os
-from os.path import dirname, abspath
-import random
-import pickle
-
-from bird import Bird
-from pipe import Pipe
-from base import Base
-
-
-pygame.font.init()
-SCORE_FONT = pygame.font.SysFont("comicsans", 50) # The font for the score
-
-WIN_WIDTH = 575 # The width of the game window
-WIN_LENGTH = 800 # The length of the game window
-
-imgs_path = dirname(dirname(abspath(__file__)))
-
-BACKGROUND_ASSET = random.choice([pygame.transform.scale2x(pygame.image.load(os.path.join(imgs_path, "imgs", "bg.png"))), pygame.transform.scale2x(pygame.image.load(os.path.join(imgs_path, "imgs", "bg_night.jpeg")))]) # Load in the game's background
-
+import argparse
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import assets
+import evaluation
+from flock import fly_flock
+from course import Course, DEFAULT_SEED
+from fitness_cache import FitnessCache
+from checkpoint import AtomicCheckpointer
+from world import World, Timestep, WIN_WIDTH, WIN_LENGTH, MAX_SCORE
+from profiling import NULL_PROFILER, Profiler, StdOutSink, CSVSink, ProfilingReporter
+from statistics_log import StreamingStatisticsReporter
+from model import save_model, load_bird
+from game_trace import TraceRecorder, Trace
+from renderer import Renderer
+from shared_evaluation import SharedMemoryEvaluator
+from islands import run_islands
+from sensors import Sensors, config_sensors
+
+
+SCORE_SIZE = 50 # The font size of the score
+
+PROFILER = NULL_PROFILER # Times the phases of every frame of the game loops (disabled unless profiling is requested)
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "best_bird.fbm") # The bird flown in the LEARN mode, and where training saves an invincible bird
+ALLOW_PICKLE = False # If True, the bird of the LEARN mode may be a bird pickled by an older version of the game (unpickling runs code: trusted files only)
+DIRTY_RENDERING = True # If True, only the parts of the window that changed are redrawn every frame (False redraws the whole window)
+SENSORS = Sensors() # The sensors the bird of the LEARN mode reads the world through (the ones chosen in the NEAT config file)
+TRACE_PATH = None # If set, every game played is recorded to this trace file (one file per generation when training)
+
+# Saves an invincible bird's neural network as the model flown in the LEARN mode
+def save_best_bird(neural_network):
+    save_model(neural_network, MODEL_PATH)
 
 
 # A method that draws the Start window of the game
 def draw_window_start(window):
-    window.blit(BACKGROUND_ASSET, (0, 0)) # The blit method actually 'draws' the background image to the game window
+    window.blit(assets.background(), (0, 0)) # The blit method actually 'draws' the background image to the game window
     
     # These sequential statements create and render the desired text to the Pygame window.
-    # They are initialized with the appropriate font and size to the center of the screen
-    intro = pygame.font.SysFont("comicsans", 26).render(f"This is classic Flappy Bird recreated, with a few extra dimensions!", 1, (255, 255, 255)) 
+    # They are initialized with the appropriate font and size to the center of the screen, and only rendered the first time the screen is drawn
+    intro = assets.text("This is classic Flappy Bird recreated, with a few extra dimensions!", 26) 
     intro_rect = intro.get_rect()
     intro_rect.center = (WIN_WIDTH / 2, WIN_LENGTH / 2 - 300)
     window.blit(intro, intro_rect)
 
-    menu = pygame.font.SysFont("comicsans", 30).render(f"Press M to open the game menu.", 1, (255, 255, 255)) 
+    menu = assets.text("Press M to open the game menu.", 30) 
     menu_rect = menu.get_rect()
     menu_rect.center = (WIN_WIDTH / 2, WIN_LENGTH / 2 - 240)
     window.blit(menu, menu_rect)
 
-    option_1 = pygame.font.SysFont("comicsans", 28).render(f"1) PLAY - Play the Game", 1, (255, 255, 255)) 
+    option_1 = assets.text("1) PLAY - Play the Game", 28) 
     option_1_rect = option_1.get_rect()
     option_1_rect.center = (WIN_WIDTH / 2 - 5, WIN_LENGTH / 2 - 150)
     window.blit(option_1, option_1_rect)
 
-    option_2 = pygame.font.SysFont("comicsans", 28).render(f"2) LEARN - Witness the power of neural networks", 1, (255, 255, 255)) 
+    option_2 = assets.text("2) LEARN - Witness the power of neural networks", 28) 
     option_2_rect = option_2.get_rect()
     option_2_rect.center = (WIN_WIDTH / 2 - 10, WIN_LENGTH / 2 - 125)
     window.blit(option_2, option_2_rect)
     
-    option_3 = pygame.font.SysFont("comicsans", 28).render(f"3) TRAIN - Train an invincible bird with AI", 1, (255, 255, 255)) 
+    option_3 = assets.text("3) TRAIN - Train an invincible bird with AI", 28) 
     option_3_rect = option_3.get_rect()
     option_3_rect.center = (WIN_WIDTH / 2 - 15, WIN_LENGTH / 2 - 100)
     window.blit(option_3, option_3_rect)
 
-    options = pygame.font.SysFont("comicsans", 30).render(f"Please press 1, 2, or 3 on your keyboard.", 1, (255, 255, 255)) 
+    option_4 = assets.text("4) WATCH - Watch the birds learn in the window", 28) 
+    option_4_rect = option_4.get_rect()
+    option_4_rect.center = (WIN_WIDTH / 2 - 10, WIN_LENGTH / 2 - 75)
+    window.blit(option_4, option_4_rect)
+
+    options = assets.text("Please press 1, 2, 3 or 4 on your keyboard.", 30) 
     options_rect = options.get_rect()
     options_rect.center = (WIN_LENGTH / 2 - 100, WIN_LENGTH / 2)
     window.blit(options, options_rect) 
@@ -72,415 +91,752 @@ def draw_window_start(window):
 
 # Creates the menu screen which displays the instructions and explains the options to the user.
 def draw_menu(window):
-    window.blit(BACKGROUND_ASSET, (0, 0)) # The blit method actually 'draws' the background image to the game window
+    window.blit(assets.background(), (0, 0)) # The blit method actually 'draws' the background image to the game window
 
     # These sequential statements create and render the desired text to the Pygame window.
-    # They are initialized with the appropriate font and size to the center of the screen
-    menu = pygame.font.SysFont("comicsans", 27).render(f"1) Your turn! Press SPACE to make the bird jump vertically.", 1, (255, 255, 255)) 
+    # They are initialized with the appropriate font and size to the center of the screen, and only rendered the first time the screen is drawn
+    menu = assets.text("1) Your turn! Press SPACE to make the bird jump vertically.", 27) 
     window.blit(menu, (30, 50)) 
 
-    menu = pygame.font.SysFont("comicsans", 30).render(f"Avoid the pipes and the ground!", 1, (255, 255, 255)) 
+    menu = assets.text("Avoid the pipes and the ground!", 30) 
     window.blit(menu, (30, 70)) 
 
-    menu = pygame.font.SysFont("comicsans", 30).render(f"2) Learn how an AI does it!", 1, (255, 255, 255)) 
+    menu = assets.text("2) Learn how an AI does it!", 30) 
     window.blit(menu, (30, 120)) 
 
-    menu = pygame.font.SysFont("comicsans", 30).render(f"Press Q at any time to quit.", 1, (255, 255, 255)) 
+    menu = assets.text("Press Q at any time to quit.", 30) 
     window.blit(menu, (30, 140)) 
 
-    menu = pygame.font.SysFont("comicsans", 30).render(f"3) Train your own AI and watch those birds go!", 1, (255, 255, 255)) 
+    menu = assets.text("3) Train your own AI in the background and watch it learn!", 27) 
     window.blit(menu, (30, 190)) 
     
-    menu = pygame.font.SysFont("comicsans", 30).render(f"Press Q at any time to quit.", 1, (255, 255, 255)) 
+    menu = assets.text("Press Q at any time to stop training.", 30) 
     window.blit(menu, (30, 210)) 
 
-    menu = pygame.font.SysFont("comicsans", 32).render(f"Press SPACE to go to the home screen.", 1, (255, 255, 255)) 
+    menu = assets.text("4) Train your own AI in the window and watch every generation fly!", 24) 
     window.blit(menu, (30, 260)) 
 
-    pygame.display.update() # Update the game window's display
-
-
-    choice = False # A boolean variable that tracks whether or not the user made a choice
+    menu = assets.text("Press Q at any time to stop training.", 30) 
+    window.blit(menu, (30, 280)) 
 
-    # While the user has not made a choice:
-    while not choice:
-        # Continually keep track of any events (i.e. key presses) from the user
-        for event in pygame.event.get():
-            # If the user chooses to close the Pygame window, quit the game and set choice to True
-            if event.type == pygame.QUIT:
-                choice = True # Set the choice to True
-            # If the user presses the SPACE key, go back to the main menu
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    main()
+    menu = assets.text("Press SPACE to go to the home screen.", 32) 
+    window.blit(menu, (30, 330)) 
 
+    pygame.display.update() # Update the game window's display
 
 # Creates the ending window when the game ends (i.e. the user's bird crashes)
 def draw_window_end(window):
-    window.blit(BACKGROUND_ASSET, (0, 0)) # The blit method actually 'draws' the background image to the game window
+    window.blit(assets.background(), (0, 0)) # The blit method actually 'draws' the background image to the game window
     
     # The same process as above for generating the text and then displaying it to the user on the game window. 
-    end = pygame.font.SysFont("comicsans", 24).render(f"Game over! Press 'SPACE' to play again and any key to quit.", 1, (255, 255, 255)) 
+    end = assets.text("Game over! Press 'SPACE' to play again and any key to quit.", 24) 
     end_rect = end.get_rect()
     end_rect.center = (WIN_WIDTH / 2, WIN_LENGTH / 2 - 100)
     window.blit(end, end_rect)
 
     pygame.display.update() # Update the game window's display
 
-    choice = False # A boolean variable that tracks whether or not the user made a choice
-
-    # While the user has not made a choice:
-    while not choice:
-         # Continually keep track of any events (i.e. key presses) from the user
-        for event in pygame.event.get():
-            # If the user chooses to close the Pygame window, quit the game and set choice to True
-            if event.type == pygame.QUIT:
-                choice = True
-            # If the user presses the SPACE key, go back to the main menu; otherwise, quit from the game 
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    main()
-                else:
-                    pygame.quit()
+# Creates the window showing the progress of training in the background: the latest generation and its fitness
+# Progress is a tuple of the generation, its best fitness and its average fitness (or None before the first generation is done)
+def draw_window_training(window, progress, status):
+    window.blit(assets.background(), (0, 0)) # The blit method actually 'draws' the background image to the game window
+
+    lines = [(status, 30)]
+    if progress is not None:
+        generation, best_fitness, mean_fitness = progress
+        lines += [(f"Generation: {generation}", 30), (f"Best fitness: {best_fitness:.1f}", 30), (f"Average fitness: {mean_fitness:.1f}", 30)]
+    lines += [("Press SPACE to go to the home screen (training carries on).", 24), ("Press Q to stop training.", 24)]
+    for i, (line, size) in enumerate(lines):
+        text = assets.text(line, size)
+        text_rect = text.get_rect()
+        text_rect.center = (WIN_WIDTH / 2, WIN_LENGTH / 2 - 200 + 50 * i)
+        window.blit(text, text_rect)
+
+    pygame.display.update() # Update the game window's display
 
 # Method to draw the game window for the birds AI to be trained
-def draw_window(window, birds, pipes, base, score, cur_gen):
-    window.blit(BACKGROUND_ASSET, (0, 0)) # The blit method actually 'draws' the background image to the game window
+# Alpha is how far the game is between its last two simulation steps, so the sprites move smoothly whatever the frame rate
+# The renderer only redraws (and pushes to the screen) the parts of the window that changed since the last frame
+def draw_window(renderer, birds, pipes, base, score, cur_gen, alpha=1):
+    with PROFILER.phase("draw"):
+        renderer.begin_frame() # Restores the background wherever something was drawn in the last frame
 
-    score_display = SCORE_FONT.render(f"Score: {score}", 1, (255, 255, 255)) # Renders the score of either the user or the AI in the game state
-    window.blit(score_display, (WIN_WIDTH - 10 - score_display.get_width(), 10)) # Draws the score onto the game window
-    
-    score_display = SCORE_FONT.render(f"Gen: {cur_gen}", 1, (255, 255, 255)) # Renders the current generation of birds
-    window.blit(score_display, (10, 10)) # Draws the generations onto the game window
+        renderer.text("score", f"Score: {score}", SCORE_SIZE, topright=(WIN_WIDTH - 10, 10)) # Draws the score of either the user or the AI in the game state
+        renderer.text("gen", f"Gen: {cur_gen}", SCORE_SIZE, topleft=(10, 10)) # Draws the current generation of birds
 
-    # Pipes is a list storing the top and bottom pipe.
-    # This for loop draws them to the game window using the previously defined draw method in the Pipe class
-    for pipe in pipes:
-        pipe.draw(window)
-    
-    base.draw(window) # Draw the base (the ground) using the previously defined draw method in the Base class
+        # Pipes is a list storing the top and bottom pipe.
+        # This for loop draws them to the game window using the previously defined draw method in the Pipe class
+        for pipe in pipes:
+            renderer.draw(pipe, alpha)
+        
+        renderer.draw(base, alpha) # Draw the base (the ground) using the previously defined draw method in the Base class
 
-    for bird in birds:
-        bird.draw(window) # Draw the bird using the previously defined draw method in the Bird class
+        renderer.draw_all(birds, alpha) # Draw the birds using the previously defined draw method in the Bird class
 
-    pygame.display.update() # Update the game window's display
+    with PROFILER.phase("display"):
+        renderer.end_frame() # Update the game window's display
 
 # Method to draw the game window for a game played by the user.
-def draw_window_classic(window, bird, pipes, base, score):
-    window.blit(BACKGROUND_ASSET, (0, 0)) # The blit method actually 'draws' the background image to the game window
+def draw_window_classic(renderer, bird, pipes, base, score, alpha=1):
+    with PROFILER.phase("draw"):
+        renderer.begin_frame() # Restores the background wherever something was drawn in the last frame
 
-    score_display = SCORE_FONT.render(f"Score: {score}", 1, (255, 255, 255))
-    window.blit(score_display, (WIN_WIDTH - 10 - score_display.get_width(), 10))
+        renderer.text("score", f"Score: {score}", SCORE_SIZE, topright=(WIN_WIDTH - 10, 10))
 
-    # Pipes is a list storing the top and bottom pipe, and this draws them to the game window using the previously defined draw method
-    for pipe in pipes:
-        pipe.draw(window)
-    
-    base.draw(window) # Draw the base (the  ground) using the previously defined draw method
+        # Pipes is a list storing the top and bottom pipe, and this draws them to the game window using the previously defined draw method
+        for pipe in pipes:
+            renderer.draw(pipe, alpha)
+        
+        renderer.draw(base, alpha) # Draw the base (the  ground) using the previously defined draw method
 
-    bird.draw(window) # Draw the bird using the previously defined draw method
+        renderer.draw(bird, alpha) # Draw the bird using the previously defined draw method
 
-    pygame.display.update() # Update the display
+    with PROFILER.phase("display"):
+        renderer.end_frame() # Update the display
 
 # Initialize a classic game, that is played by the user and analogous to the original game itself (i.e. the PLAY option)
-def classic_game():
-    bird = Bird(230, 350) # Initialize a bird object
-    base = Base() # Initialize the base object
-    pipes = [Pipe(WIN_WIDTH)] # A list that keeps track of the current pipes
-    window = pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)) # Initialize the window
-    clock = pygame.time.Clock() # Sets the frame rate i.e. the tick rate of the game
-    user_score = 0 # The current score of the user
+# The pipes come from the course generated from seed, or from a fresh course if no seed is given
+# The game is recorded to trace_path (TRACE_PATH by default), if set, so it can be replayed later
+def classic_game(seed=None, trace_path=None):
+    world = World(1, Course.random_seed() if seed is None else seed, PROFILER) # The simulation, with the user's bird
+    bird = world.birds[0]
+    renderer = Renderer(pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)), DIRTY_RENDERING) # Initialize the window
+    timestep = Timestep() # Runs the simulation at a fixed rate, however fast the window is drawn
+    jump = False # Whether the user pressed SPACE since the last simulation step
+
+    # The bird jumps at the next simulation step after the user pressed SPACE
+    def think(next_pipe):
+        nonlocal jump
+        if jump:
+            bird.jump()
+            jump = False
+
+    # Record every jump, so the game can be replayed exactly
+    trace_path = TRACE_PATH if trace_path is None else trace_path
+    recorder = None
+    if trace_path is not None:
+        recorder = TraceRecorder(world)
+        think = recorder.wrap(think)
 
     play_game = True # A boolean variable that tracks whether the game should continue to run
 
     # While the user has not quit or failed:
     while play_game:
-        clock.tick(30) # A maximum of 30 ticks every second
-        # For each event (i.e. a keyboard trigger, mouse click, etc.):
-        for event in pygame.event.get():
-            # If the user hits the X in the Pygame window, exit the game and terminate the program
-            if event.type == pygame.QUIT:
-                play_game = False
-            # Otherwise, if the user presses SPACE, make the bird jump
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    bird.jump()
-        
-        add_pipe = False # Keeps track of whether or not to add a new pipe to the game window
-        removed_pipes = [] # A list to store the pipes that need to be removed
+        steps = timestep.steps() # Waits for the next frame
+        with PROFILER.phase("events"):
+            # For each event (i.e. a keyboard trigger, mouse click, etc.):
+            for event in pygame.event.get():
+                # If the user hits the X in the Pygame window, exit the game and terminate the program
+                if event.type == pygame.QUIT:
+                    play_game = False
+                # Otherwise, if the user presses SPACE, make the bird jump
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        jump = True
         
-        # Call the move method defined for each pipe object that currently exists
-        # Pipes is a list storing the top and bottom pipe, and this draws them to the game window using the previously defined draw method
-        for pipe in pipes:
-            # If the bird collides with a pipe or falls off the screen, terminate the current game
-            if pipe.collide(bird) == True or (bird.y + bird.img.get_height() >= base.y or bird.y < 0):
+        # Advance the game by as many fixed steps as the time since the last frame calls for
+        # If the bird collides with a pipe or falls off the screen, terminate the current game
+        for _ in range(steps):
+            world.step(think)
+            if not world.alive:
                 play_game = False
-            else:
-                # If the pipe is now completely off the screen, add it to the list of pipes to be removed
-                if pipe.x + pipe.PIPE_TOP.get_width() < 0:
-                    removed_pipes.append(pipe)
-            
-                # If the bird has passed the pipe and the pipe has not been passed before, we need to draw a new pipe
-                if not pipe.bird_passed and pipe.x < bird.x:
-                    pipe.bird_passed = True
-                    add_pipe = True
-                
-                # Move the pipes leftwards
-                pipe.move()
-        
-        # If the user has passed the set of pipes, increment their score and add the pipes to the list to be removed
-        if add_pipe:
-            user_score += 1
-            pipes.append(Pipe(WIN_WIDTH))
-        for rem in removed_pipes:
-            pipes.remove(rem)
-        if bird.y + bird.img.get_height() >= base.y:
-            pass
-        
-        bird.move() # Call the move method defined for a bird object
-        base.move() # Call the move method defined for a base object 
+                break
 
-        draw_window_classic(window, bird, pipes, base, user_score) # Draw the game window
-    
-    window = pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)) # Initialize the window
-    draw_window_end(window)
+        draw_window_classic(renderer, bird, world.pipes, world.base, world.score, timestep.alpha()) # Draw the game window
+        PROFILER.end_frame()
+
+    PROFILER.end_generation(None) # A game is reported like a generation of its own
+    if recorder is not None:
+        recorder.save(trace_path)
 
 # A game played by a previously trained AI bird (i.e. the LEARN option)
-def ai_game():
-    trained_bird = open("C:\Projects\Flappy-Bird-NEAT\\best_bird.pickle", "rb") # Open the save neural network file
-    bird_neural_network = pickle.load(trained_bird) # Load in the deserialized object using pickle
-    bird = Bird(230, 350) # Initialize the bird object
-    base = Base() # Initialize the base
-    pipes = [Pipe(WIN_WIDTH)] # A list that keeps track of the current pipes
-    window = pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)) # Initialize the window
-    clock = pygame.time.Clock() # Sets the frame rate i.e. the tick rate of the game
-    bird_score = 0 # The score of the bird
+# The pipes come from the course generated from seed, or from a fresh course if no seed is given
+# The bird is loaded from model_path (MODEL_PATH by default), which may also be a bird pickled by an older version of the game if ALLOW_PICKLE is set
+# The game is recorded to trace_path (TRACE_PATH by default), if set, so it can be replayed later
+def ai_game(seed=None, model_path=None, trace_path=None):
+    bird_neural_network = load_bird(MODEL_PATH if model_path is None else model_path, ALLOW_PICKLE) # Load in the saved neural network
+    SENSORS.check(bird_neural_network) # A bird trained with other sensors could not make sense of its inputs
+    world = World(1, Course.random_seed() if seed is None else seed, PROFILER) # The simulation, with the trained bird
+    bird = world.birds[0]
+    renderer = Renderer(pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)), DIRTY_RENDERING) # Initialize the window
+    timestep = Timestep() # Runs the simulation at a fixed rate, however fast the window is drawn
+
+    # The output of the neural network based on what the bird's sensors read (e.g. its position relative to the pipes)
+    # If the output of the network is greater than 0.5, make the bird jump
+    inputs = [0.0] * SENSORS.size
+    def think(next_pipe):
+        nn_output = bird_neural_network.activate(SENSORS.read_into(inputs, bird, next_pipe, world.pipes))
+        if nn_output[0] > 0.5:
+            bird.jump()
+
+    # Record every jump, so the game can be replayed exactly
+    trace_path = TRACE_PATH if trace_path is None else trace_path
+    recorder = None
+    if trace_path is not None:
+        recorder = TraceRecorder(world)
+        think = recorder.wrap(think)
 
     play_game = True # A boolean variable that tracks whether the game should continue to run
 
     # While the user has not quit the game:
     while play_game:
-        clock.tick(30) # A maximum of 30 ticks every second
-        # For each event (i.e. a keyboard trigger, mouse click, etc.):
-        for event in pygame.event.get():
-            # If the user hits the X in the Pygame window, exit the game and terminate the program
-            if event.type == pygame.QUIT:
-                play_game = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_q:
-                    pygame.quit()
-        
-        # The index of the pipe inputted into the neural network
-        pipe_index = 0
-        
-        # If the bird has already passed the 1st pipe in the list, then set pipe_index to the 2nd 
-        if len(pipes) > 1 and bird.x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
-            pipe_index = 1
-        
-        # Continually move the bird
-        bird.move()
+        steps = timestep.steps() # Waits for the next frame
+        with PROFILER.phase("events"):
+            # For each event (i.e. a keyboard trigger, mouse click, etc.):
+            for event in pygame.event.get():
+                # If the user hits the X in the Pygame window, exit the game and terminate the program
+                if event.type == pygame.QUIT:
+                    play_game = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_q:
+                        pygame.quit()
         
-        # The output of the neural network based on the position of the bird relative to the pipes
-        nn_output = bird_neural_network.activate((bird.y, abs(bird.y - pipes[pipe_index].height), abs(bird.y - pipes[pipe_index].bottom_pipe)))
-        
-        # If the output of the network is greater than 0.5, make the bird jump
-        if nn_output[0] > 0.5:
-            bird.jump()
+        # Advance the game by as many fixed steps as the time since the last frame calls for
+        for _ in range(steps):
+            world.step(think)
+            if not world.alive:
+                play_game = False
+                break
 
-        
-        add_pipe = False # Keeps track of whether or not to add a new pipe to the game window
-        removed_pipes = [] # A list to store the pipes that need to be removed
-        # Call the move method defined for each pipe object that currently exists
-        # Pipes is a list storing the top and bottom pipe, and this draws them to the game window using the previously defined draw method
-        for pipe in pipes:
-            if pipe.collide(bird) == True or (bird.y + bird.img.get_height() >= base.y or bird.y < 0):
+        draw_window_classic(renderer, bird, world.pipes, world.base, world.score, timestep.alpha()) # Draw the game window
+        PROFILER.end_frame()
+
+    PROFILER.end_generation(None) # A game is reported like a generation of its own
+    if recorder is not None:
+        recorder.save(trace_path)
+
+# Replays a recorded game (of any mode) in the window, exactly as it was played
+def trace_game(trace_path):
+    trace = Trace(trace_path) # The recorded game
+    world, think = trace.world(PROFILER) # The simulation, with the birds jumping exactly when they did in the recording
+    renderer = Renderer(pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)), DIRTY_RENDERING) # Initialize the window
+    timestep = Timestep() # Runs the simulation at a fixed rate, however fast the window is drawn
+
+    play_game = True # A boolean variable that tracks whether the replay should continue to run
+
+    # While the user has not quit and the recording has not ended:
+    while play_game:
+        steps = timestep.steps() # Waits for the next frame
+        with PROFILER.phase("events"):
+            for event in pygame.event.get():
+                # If the user hits the X in the Pygame window, stop the replay
+                if event.type == pygame.QUIT:
+                    play_game = False
+
+        # Advance the replay by as many fixed steps as the time since the last frame calls for
+        for _ in range(steps):
+            world.step(think)
+            if not world.alive or world.steps >= trace.steps:
                 play_game = False
-            else:
-                # If the pipe is now completely off the screen, add it to the list of pipes to be removed
-                if pipe.x + pipe.PIPE_TOP.get_width() < 0:
-                    removed_pipes.append(pipe)
-            
-                # If the bird has passed the pipe and the pipe has not been passed before, we need to draw a new pipe
-                if not pipe.bird_passed and pipe.x < bird.x:
-                    pipe.bird_passed = True
-                    add_pipe = True
-                
-                # Move the pipes leftward
-                pipe.move()
-        
-        # If the bird has passed the set of pipes, increment their score and add the pipes to the list to be removed
-        if add_pipe:
-            bird_score += 1
-            pipes.append(Pipe(WIN_WIDTH))
-        for rem in removed_pipes:
-            pipes.remove(rem)
-        if bird.y + bird.img.get_height() >= base.y:
-            pass
+                break
 
-        base.move() # Call the move method defined for a base object 
+        # A recorded generation is drawn like training, and a single bird like a game
+        if trace.num_birds == 1:
+            draw_window_classic(renderer, world.birds[0], world.pipes, world.base, world.score, timestep.alpha())
+        else:
+            draw_window(renderer, world.living_birds(), world.pipes, world.base, world.score, "replay", timestep.alpha())
+        PROFILER.end_frame()
 
-        draw_window_classic(window, bird, pipes, base, bird_score) # Draw the game window
+    PROFILER.end_generation(None) # A replay is reported like a generation of its own
 
 # The current generation of the birds being trained
 CUR_GEN = 0
+# Whether gen_training has counted a generation in CUR_GEN that it has not finished evaluating (i.e. training was interrupted inside it)
+GENERATION_STARTED = False
+# If True, the birds are trained without a window or a frame clock, so each generation runs as fast as the CPU allows
+HEADLESS_TRAINING = False
+# While training headless, every Nth generation is still drawn in the window at 30 steps per second for spot checks (0 never draws)
+RENDER_EVERY_N_GEN = 0
+# If True, generations that are not drawn are simulated by the vectorised NumPy flock instead of a list of Bird objects
+VECTORISED_TRAINING = False
 # A game where the birds are trained and the user can view the training (i.e. the TRAIN option)
 def gen_training(genomes, config):
-    global CUR_GEN # Declare global variables
+    global CUR_GEN, GENERATION_STARTED # Declare global variables
     cur_neural_networks = [] # A list that stores all the neural networks for each bird being trained
     cur_genomes = [] # A list that stores the fitness for all the birds
-    birds = [] # A list that stores all the birds 
     CUR_GEN += 1
+    GENERATION_STARTED = True
 
     # Iterate through genomes and initialize the birds, along with their fitness and neural network
     for _, g in genomes:
         g.fitness = 0
         neural_network = neat.nn.FeedForwardNetwork.create(g, config)
         cur_neural_networks.append(neural_network)
-        birds.append(Bird(230, 350))
         cur_genomes.append(g)
         
+    # The generation is drawn unless training headless, in which case only every Nth generation is drawn (if requested)
+    render = not HEADLESS_TRAINING or (RENDER_EVERY_N_GEN > 0 and CUR_GEN % RENDER_EVERY_N_GEN == 0)
+
+    # Every generation flies the course generated from the run's seed, so their fitness can be compared
+    seed = getattr(config, "course_seed", DEFAULT_SEED)
+    sensors = config_sensors(config)
+
+    # A generation that is not drawn (or recorded) can be handed to the vectorised flock, which simulates every bird at once
+    if not render and VECTORISED_TRAINING and TRACE_PATH is None:
+        fitnesses, score, survivors = fly_flock(cur_neural_networks, Course.get(seed), profiler=PROFILER, sensors=sensors)
+        PROFILER.end_generation(CUR_GEN)
+        for g, fitness in zip(cur_genomes, fitnesses):
+            g.fitness = float(fitness)
+
+        # If the birds score is over 150, save the first surviving bird as the new best bird
+        # (the last birds can die in the same step that passes the pipe, leaving no survivor to save)
+        if score > MAX_SCORE and len(survivors):
+            save_best_bird(cur_neural_networks[survivors[0]])
+        GENERATION_STARTED = False
+        return
+
+    world = World(len(cur_genomes), seed, PROFILER) # The simulation, with one bird per genome
+    # The window and the frame clock are only needed when the generation is drawn
+    if render:
+        renderer = Renderer(pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)), DIRTY_RENDERING) # Initialize the window
+        timestep = Timestep() # Runs the simulation at a fixed rate, however fast the window is drawn
+
+    # Computes and stores each living bird's neural network output to decide if it should jump
+    # The same list of inputs is refilled for every bird rather than building a new one each time
+    inputs = [0.0] * sensors.size
+    def think(next_pipe):
+        for i in world.alive:
+            bird = world.birds[i]
+            nn_output = cur_neural_networks[i].activate(sensors.read_into(inputs, bird, next_pipe, world.pipes))
+            if nn_output[0] > 0.5:
+                bird.jump()
 
-    base = Base() # Create the base object
-    pipes = [Pipe(WIN_WIDTH)] # A list that keeps track of the current pipes
-    window = pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)) # Initialize the window
-    clock = pygame.time.Clock() # Sets the frame rate i.e. the tick rate of the game
-    score = 0 # The score of the best bird of the generation
+    # Record every generation to its own trace file, e.g. game-3.fbt for the third generation recorded to game.fbt
+    recorder = None
+    if TRACE_PATH is not None:
+        recorder = TraceRecorder(world)
+        think = recorder.wrap(think)
 
     play_game = True # A boolean variable that tracks whether the game should continue to run
 
-    # While the user has not quit
-    while play_game:
-        clock.tick(30) # A maximum of 30 ticks every second
-        # For each event (i.e. a keyboard trigger, mouse click, etc.):
-        for event in pygame.event.get():
-            # If the user hits the X in the Pygame window, exit the game and terminate the program
-            if event.type == pygame.QUIT:
+    # While the user has not quit and there are birds left
+    while play_game and world.alive:
+        # A headless generation has no window to poll and no frame rate cap, so it takes exactly one step per loop, as fast as possible
+        steps = 1
+        if render:
+            steps = timestep.steps() # Waits for the next frame
+            with PROFILER.phase("events"):
+                # For each event (i.e. a keyboard trigger, mouse click, etc.):
+                for event in pygame.event.get():
+                    # If the user hits the X in the Pygame window, exit the game and terminate the program
+                    if event.type == pygame.QUIT:
+                        play_game = False
+                        pygame.quit() # Quit the Pygame window
+                        quit() # Quit the program
+                    # Pressing Q stops training, like it does for training in the background, but leaves the window open
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_q:
+                            raise TrainingStopped()
+
+        for _ in range(steps):
+            # Every living bird is rewarded for each step it stays alive
+            for i in world.alive:
+                cur_genomes[i].fitness += 0.1
+
+            crashed, passed, fell = world.step(think)
+
+            # Hitting a pipe is penalised
+            for i in crashed:
+                cur_genomes[i].fitness -= 1
+
+            # If the birds have passed the set of pipes, the ones still flying get their fitness incremented by 5
+            # This motivates them to pass pipes to make it as far as possible (even if they hit the ground right after)
+            if passed:
+                for i in world.alive + fell:
+                    cur_genomes[i].fitness += 5
+
+            # If the birds score is over 150, make the first surviving bird the new best bird and save it to a file, and terminate the game
+            if world.score > MAX_SCORE or not world.alive:
+                if world.alive:
+                    save_best_bird(cur_neural_networks[world.alive[0]])
                 play_game = False
-                pygame.quit() # Quit the Pygame window
-                quit() # Quit the program
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_q:
-                    pygame.quit()
-        
-        pipe_index = 0 # The index of the pipe to be inputted into the neural network
-        # If the birds list is not empty, set pipe_index to 1 (the second pipe in the list) if the bird has already passed the first pipe
-        if len(birds) > 0:
-            if len(pipes) > 1 and birds[0].x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
-                pipe_index = 1
-        else:
-            run = False
-            break
-        
-        # A for loop to iterate through the birds and modify their fitness
-        # Computes and stores the neural network's output to decide if a bird should jump
-        for x, bird in enumerate(birds):
-            cur_genomes[x].fitness += 0.1
-            bird.move()
-            
-            nn_output = cur_neural_networks[x].activate((bird.y, abs(bird.y - pipes[pipe_index].height), abs(bird.y - pipes[pipe_index].bottom_pipe)))
-
-            if nn_output[0] > 0.5:
-                bird.jump()
-
-        
-        add_pipe = False # Keeps track of whether or not to add a new pipe to the game window
-        removed_pipes = [] # A list to store the pipes that need to be removed
-        # Call the move method defined for each pipe object that currently exists
-        # Pipes is a list storing the top and bottom pipe, and this draws them to the game window using the previously defined draw method
-        for pipe in pipes:
-            for i, bird in enumerate(birds):
-                if pipe.collide(bird) == True:
-                    cur_genomes[i].fitness -= 1
-                    birds.pop(i)
-                    cur_neural_networks.pop(i)
-                    cur_genomes.pop(i)
-
-                # If the bird has passed the pipe and the pipe has not been passed before, we need to draw a new pipe
-                if not pipe.bird_passed and pipe.x < bird.x:
-                    pipe.bird_passed = True
-                    add_pipe = True
-                    
-            # If the pipe is now completely off the screen, add it to the list of pipes to be removed
-            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
-                removed_pipes.append(pipe)
-
-            # Move the pipe leftward    
-            pipe.move()
-        
-        # If the bird has passed the set of pipes, increment their score and add the pipes to the list to be removed
-        # Their fitness is also incremented by 5, motivating them to pass pipes to make it as far as possible
-        if add_pipe:
-            score += 1
-            for g in cur_genomes:
-                g.fitness += 5
-            pipes.append(Pipe(WIN_WIDTH))
-        for rem in removed_pipes:
-            pipes.remove(rem)
-        
-        for i, bird in enumerate(birds):
-            if bird.y + bird.img.get_height() >= base.y or bird.y < 0:
-                birds.pop(i)
-                cur_neural_networks.pop(i)
-                cur_genomes.pop(i)
-        
-        base.move() # Call the move method defined for a base object
+                break
 
-        # If the birds score is over 150, make them the new best bird and save them to a file, and terminate the game
-        if score > 150:
-            pickle.dump(cur_neural_networks[0], open("best_bird.pickle", "wb"))
-            play_game = False
-            break
+        if render:
+            draw_window(renderer, world.living_birds(), world.pipes, world.base, world.score, CUR_GEN, timestep.alpha()) # Draw the game window
+        PROFILER.end_frame()
 
-        draw_window(window, birds, pipes, base, score, CUR_GEN) # Draw the game window
+    PROFILER.end_generation(CUR_GEN)
+    if recorder is not None:
+        root, ext = os.path.splitext(TRACE_PATH)
+        recorder.save("{0}-{1}{2}".format(root, CUR_GEN, ext))
+    GENERATION_STARTED = False
 
 # Initializes the neural network and the parameters for the NEAT algorithm
 # This was created by following the NEAT libraries official documentation, 
-def run(config_file):
-    # Initialize the configuration file for the neural network & algorithm's parameters
-    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
-
-    population = neat.Population(config) # Sets the population of a generation
+# When headless is True, training skips the window and frame clock, drawing only every render_every generations (0 never)
+# When workers is greater than 0, genomes are instead evaluated one bird each across that many processes (see SharedMemoryEvaluator)
+# Every generation flies the pipe course generated from seed (a fresh random seed for each run if none is given)
+# When vectorised is True, the generations that are not drawn are simulated by the NumPy flock
+# When cache_size is greater than 0, the fitness of that many genomes is remembered (optionally in cache_file) so unchanged genomes are not flown again
+# When checkpoint_every or checkpoint_seconds is set, the run is saved that often (and whenever training is interrupted) to checkpoint_prefix<generation>
+# When resume_from names a checkpoint, the run carries on from it (with its own config and course) instead of starting from generation 0
+# When courses is greater than 1 (or max_steps is set), every genome instead flies that many courses derived from seed, for at most max_steps
+# steps each, without a window; its fitness is the mean or min (aggregate) of its flights, and (without workers) a genome stops flying
+# as soon as it can no longer beat the top_k best genomes of its generation (0 never stops early)
+# When stats_file is set, a summary of every generation is appended to it (JSON lines, or CSV if it ends in .csv), stats_flush_every generations at a time
+# Any other reporters given are added to the population too
+def run(config_file, headless=False, render_every=0, workers=0, seed=None, vectorised=False, cache_size=0, cache_file=None,
+        checkpoint_every=None, checkpoint_seconds=None, checkpoint_prefix="neat-checkpoint-", resume_from=None,
+        courses=1, aggregate="mean", top_k=0, max_steps=None, stats_file=None, stats_flush_every=10, reporters=()):
+    global CUR_GEN, GENERATION_STARTED, HEADLESS_TRAINING, RENDER_EVERY_N_GEN, VECTORISED_TRAINING # Declare global variables
+    HEADLESS_TRAINING = headless
+    RENDER_EVERY_N_GEN = render_every
+    VECTORISED_TRAINING = vectorised
+
+    if resume_from is not None:
+        # Restore the population, species, generation and random state, along with the generation counter shown in the window
+        population, state = AtomicCheckpointer.restore_checkpoint(resume_from)
+        config = population.config
+        CUR_GEN = state.get("cur_gen", population.generation)
+    else:
+        # Initialize the configuration file for the neural network & algorithm's parameters
+        config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
+        Sensors.from_file(config_file).configure(config) # The networks take one input per sensor chosen in the config file
+
+        config.course_seed = Course.random_seed() if seed is None else seed # The course travels with the config, so every worker rebuilds the same one
+        # So do the courses of a multi-course run, along with how their fitness is combined
+        if courses > 1 or max_steps is not None:
+            config.course_seeds = Course.seeds(config.course_seed, courses)
+            config.fitness_aggregate = aggregate
+            config.max_course_steps = max_steps
+
+        population = neat.Population(config) # Sets the population of a generation
     
     population.add_reporter(neat.StdOutReporter(True)) # Provides stats regarding the current generation and fitness
-    population.add_reporter(neat.StatisticsReporter())
-
-    winner = population.run(gen_training, 64)
+    # The history of the run is streamed to disk rather than kept in memory for the whole run
+    statistics = None
+    if stats_file is not None:
+        statistics = StreamingStatisticsReporter(stats_file, stats_flush_every)
+        population.add_reporter(statistics)
+    # Profiling sinks that are NEAT reporters report alongside the other reporters
+    for sink in PROFILER.sinks:
+        if isinstance(sink, neat.reporting.BaseReporter):
+            population.add_reporter(sink)
+
+    for reporter in reporters:
+        population.add_reporter(reporter)
+
+    # Periodically save the run so that it can be resumed
+    checkpointer = None
+    if checkpoint_every is not None or checkpoint_seconds is not None:
+        checkpointer = AtomicCheckpointer(checkpoint_every, checkpoint_seconds, checkpoint_prefix, lambda: {"cur_gen": CUR_GEN})
+        population.add_reporter(checkpointer)
+
+    # Evaluate the genomes in lock-step in this process, or spread them over worker processes that read the genomes' networks from shared memory
+    multi_course = getattr(config, "course_seeds", None) is not None
+    evaluator = None
+    stopped_early = None # Returns the genomes the fitness function stopped flying early, for a fitness function that can stop early
+    if workers > 0:
+        evaluator = SharedMemoryEvaluator(workers)
+        fitness_function = evaluator.evaluate
+    elif multi_course:
+        multi_course_evaluator = evaluation.MultiCourseEvaluator(top_k)
+        fitness_function = multi_course_evaluator.evaluate
+        stopped_early = lambda: multi_course_evaluator.stopped_early
+    else:
+        fitness_function = gen_training
+
+    # Genomes that already flew this course (e.g. elites carried over unchanged) take their fitness from the cache instead
+    # (unless they stopped flying early, when their fitness only counts some of the courses)
+    if cache_size > 0:
+        fitness_function = FitnessCache(cache_size, cache_file).wrap(fitness_function, stopped_early)
 
-# The main method
-def main():
-    window = pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)) # Initialize the window
-    
-    draw_window_start(window) # Draw the start window
+    try:
+        winner = population.run(fitness_function, 64)
+    except (KeyboardInterrupt, SystemExit, pygame.error):
+        # Closing the window, pressing Q or Ctrl+C would otherwise throw away all of the progress made so far
+        if checkpointer is not None:
+            # If the interrupted generation was being evaluated by gen_training, it has already been counted, but it will be run again.
+            # An interrupt anywhere else (e.g. in a reporter between generations, or in another fitness function) leaves CUR_GEN as it is
+            if GENERATION_STARTED:
+                CUR_GEN -= 1
+                GENERATION_STARTED = False
+            checkpointer.save_now(population)
+        raise
+    finally:
+        # The summaries still in the buffer are written, and the workers and their shared memory freed, however the run ends
+        if statistics is not None:
+            statistics.close()
+        if evaluator is not None:
+            evaluator.close()
+
+    if workers > 0 or multi_course:
+        # Fly the winner once more (over every course) and, just like gen_training, only save it if it proved to be invincible
+        winner_neural_network = neat.nn.FeedForwardNetwork.create(winner, config)
+        winner_score = min(evaluation.fly(winner_neural_network, seed, sensors=config_sensors(config))[1]
+                           for seed in getattr(config, "course_seeds", None) or [config.course_seed])
+        if winner_score > evaluation.MAX_SCORE:
+            save_best_bird(winner_neural_network)
+
+IDLE_FPS = 30 # How many times a second the screens waiting for a key (or showing training progress) check for one
+
+# Raised inside training running in the background when the user stops it.
+# It is a KeyboardInterrupt so that run treats it like Ctrl+C (saving a checkpoint if checkpoints are enabled)
+class TrainingStopped(KeyboardInterrupt):
+    pass
+
+# A NEAT reporter that sends the progress of training running in the background to the app, and stops training when the app asks it to
+class ProgressReporter(neat.reporting.BaseReporter):
+
+    # The constructor for the ProgressReporter class, with the queue the progress is sent on and the event set to stop training
+    def __init__(self, progress, stop):
+        self.progress = progress # Receives a tuple of the generation, its best fitness and its average fitness after every generation
+        self.stop = stop # Set by the app to stop training before the next generation
+        self.generation = None # The generation being evaluated
+
+    def start_generation(self, generation):
+        if self.stop.is_set():
+            raise TrainingStopped()
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        fitnesses = [genome.fitness for genome in population.values()]
+        self.progress.put((self.generation, best_genome.fitness, sum(fitnesses) / len(fitnesses)))
+
+# Trains headless in a process of its own, so the app stays responsive, reporting progress on the progress queue until the stop event is set
+# An invincible bird is saved to model_path, where the LEARN mode picks it up
+# Returns whether training ran to the end (rather than being stopped)
+def train_in_background(config_file, model_path, progress, stop):
+    global MODEL_PATH # Declare global variables
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Nothing is drawn, so SDL does not need a real display
+    MODEL_PATH = model_path
+    try:
+        run(config_file, headless=True, vectorised=True, reporters=[ProgressReporter(progress, stop)])
+    except TrainingStopped:
+        return False
+    return True
+
+# An App class that runs the menus and game modes as one asyncio loop.
+# Each screen is a coroutine that returns the next screen to show (or None to quit), so going back to the start screen is just another
+# step of the loop instead of a recursive call. Screens waiting for a key sleep between checks instead of spinning, so an idle window
+# uses (almost) no CPU, and training runs in a separate process (an executor) so the menus stay responsive while it goes on.
+class App:
+
+    # The constructor for the App class
+    def __init__(self):
+        self.executor = None # The process that trains in the background, started the first time training is chosen
+        self.manager = None # Shares the progress queue and stop event with the training process
+        self.training = None # The future of the training running in the background, if any
+        self.progress_queue = None # The progress sent by the training process
+        self.stop = None # Set to stop the training process
+        self.progress = None # The latest progress received: the generation, its best fitness and its average fitness
+
+    # Runs the app until the user quits
+    async def run(self):
+        pygame.display.set_mode((WIN_WIDTH, WIN_LENGTH)) # Initialize the window
+        screen = self.start_screen
+        try:
+            while screen is not None:
+                screen = await screen()
+        finally:
+            self.stop_training()
+
+    # Waits for the user to press a key, checking IDLE_FPS times a second and calling redraw (if given) every time
+    # Returns the key pressed, or None if the user closed the window
+    async def wait_for_key(self, redraw=None):
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return None
+                if event.type == pygame.KEYDOWN:
+                    return event.key
+            if redraw is not None:
+                redraw()
+            await asyncio.sleep(1 / IDLE_FPS)
+
+    # The start screen, where the user chooses what to do
+    async def start_screen(self):
+        draw_window_start(pygame.display.get_surface()) # Draw the start window
+        while True:
+            key = await self.wait_for_key()
+            if key is None:
+                return None
+            if key == pygame.K_1:
+                classic_game()
+                return self.end_screen
+            elif key == pygame.K_2:
+                ai_game()
+                return self.start_screen
+            elif key == pygame.K_3:
+                self.start_training()
+                return self.training_screen
+            elif key == pygame.K_4:
+                self.watch_training()
+                return self.start_screen
+            elif key == pygame.K_m:
+                return self.menu_screen
+
+    # The menu screen, explaining the game modes
+    async def menu_screen(self):
+        draw_menu(pygame.display.get_surface())
+        while True:
+            key = await self.wait_for_key()
+            if key is None:
+                return None
+            # If the user presses the SPACE key, go back to the start screen
+            if key == pygame.K_SPACE:
+                return self.start_screen
+
+    # The screen shown when the user's bird crashes
+    async def end_screen(self):
+        draw_window_end(pygame.display.get_surface())
+        key = await self.wait_for_key()
+        # If the user presses the SPACE key, go back to the start screen; otherwise, quit from the game
+        return self.start_screen if key == pygame.K_SPACE else None
+
+    # The screen showing the progress of training, which carries on in the background whichever screen is shown
+    async def training_screen(self):
+        window = pygame.display.get_surface()
+        shown = [] # The progress and status drawn last, so the window is only drawn again when they change
+
+        def redraw():
+            # Take every update sent since the last check, keeping only the latest
+            while not self.progress_queue.empty():
+                self.progress = self.progress_queue.get()
+            if not self.training.done():
+                status = "Stopping training..." if self.stop.is_set() else "Training in the background..."
+            elif self.training.exception() is not None:
+                status = f"Training failed: {self.training.exception()}"
+            else:
+                status = "Training finished!" if self.training.result() else "Training stopped."
+            if shown != [self.progress, status]:
+                shown[:] = [self.progress, status]
+                draw_window_training(window, self.progress, status)
+
+        while True:
+            key = await self.wait_for_key(redraw)
+            if key is None:
+                return None
+            if key == pygame.K_SPACE:
+                return self.start_screen
+            elif key == pygame.K_q:
+                self.stop.set()
+
+    # Starts training in the background, unless it is already running
+    def start_training(self):
+        if self.training is not None and not self.training.done():
+            return
+        # The training process is started fresh (rather than forked), so it does not inherit the window
+        context = multiprocessing.get_context("spawn")
+        if self.executor is None:
+            self.manager = context.Manager()
+            self.executor = ProcessPoolExecutor(max_workers=1, mp_context=context)
+        self.progress_queue = self.manager.Queue()
+        self.stop = self.manager.Event()
+        self.progress = None
+        config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "neatconfig.txt")
+        self.training = asyncio.get_running_loop().run_in_executor(self.executor, train_in_background, config_file, MODEL_PATH,
+                                                                   self.progress_queue, self.stop)
+
+    # Trains in this process instead, drawing every generation in the window so the birds can be watched as they learn
+    # The app waits while training runs, until the user presses Q (stopping training) or training finishes
+    def watch_training(self):
+        config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "neatconfig.txt")
+        try:
+            run(config_file)
+        except TrainingStopped:
+            pass
 
-    choice = False # Boolean variable that tracks whether the user has made a choice or not
-    
-    # While the user has not made a choice:
-    # Allow the user to press the appropriate key to make their selection and calling the corresponding method
-    while not choice:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                choice = True
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    choice = True
-                    classic_game()
-                elif event.key == pygame.K_2:
-                    choice = True
-                    ai_game()
-                elif event.key == pygame.K_3:
-                    choice = True
-                    config_file = os.path.join(os.path.dirname(__file__), "neatconfig.txt")
-                    run(config_file) 
-                elif event.key == pygame.K_m:
-                    choice = True
-                    draw_menu(window)
+    # Stops training (after the generation being evaluated) and waits for the training process to finish
+    def stop_training(self):
+        if self.executor is None:
+            return
+        self.stop.set()
+        self.executor.shutdown(wait=True)
+        self.manager.shutdown()
+        self.executor = None
 
 # Calls the program from the command line when run and handles any excpetions
 if __name__ == '__main__':
-    try:
-        main()
-    except pygame.error:
+    # Training can be started directly from the command line, optionally without a window (e.g. on a build machine)
+    parser = argparse.ArgumentParser(description="Flappy Bird with NEAT")
+    parser.add_argument("--train", action="store_true", help="skip the menus and start training straight away")
+    parser.add_argument("--headless", action="store_true", help="train without a window or frame rate cap")
+    parser.add_argument("--render-every", type=int, default=0, metavar="N", help="while headless, draw every Nth generation")
+    parser.add_argument("--workers", type=int, default=0, metavar="N", help="evaluate genomes in N processes (implies --headless)")
+    parser.add_argument("--seed", type=int, default=None, help="the seed of the pipe course flown during training (0 to 2**64 - 1)")
+    parser.add_argument("--vectorised", action="store_true", help="simulate the undrawn generations with the NumPy flock")
+    parser.add_argument("--fitness-cache", type=int, default=0, metavar="N", help="remember the fitness of up to N genomes")
+    parser.add_argument("--fitness-cache-file", default=None, metavar="PATH", help="keep the fitness cache in this file between runs")
+    parser.add_argument("--checkpoint-every", type=int, default=None, metavar="N", help="save a checkpoint every N generations")
+    parser.add_argument("--checkpoint-seconds", type=float, default=None, metavar="S", help="save a checkpoint every S seconds")
+    parser.add_argument("--checkpoint-prefix", default="neat-checkpoint-", metavar="PREFIX", help="where to save the checkpoints")
+    parser.add_argument("--resume", default=None, metavar="CHECKPOINT", help="carry on training from a checkpoint")
+    parser.add_argument("--courses", type=int, default=1, metavar="K", help="fly every genome over K courses derived from the seed")
+    parser.add_argument("--aggregate", choices=["mean", "min"], default="mean", help="how the fitness of the K courses is combined")
+    parser.add_argument("--top-k", type=int, default=0, metavar="N", help="stop flying a genome once it cannot beat the N best of its generation")
+    parser.add_argument("--max-steps", type=int, default=None, metavar="N", help="end every flight of a multi-course run after N steps")
+    parser.add_argument("--model", default=None, metavar="PATH", help="the bird flown in the LEARN mode (and where training saves one)")
+    parser.add_argument("--allow-pickle", action="store_true", help="let --model be a bird pickled by an older version (unpickling runs code: trusted files only)")
+    parser.add_argument("--islands", type=int, default=0, metavar="N", help="evolve N populations in separate processes, each on its own courses")
+    parser.add_argument("--migration-every", type=int, default=5, metavar="N", help="with --islands, trade genomes between islands every N generations")
+    parser.add_argument("--migrants", type=int, default=2, metavar="K", help="with --islands, the number of best genomes each island sends on")
+    parser.add_argument("--stats", default=None, metavar="PATH", help="append a summary of every generation to a JSON lines (or .csv) file")
+    parser.add_argument("--stats-flush-every", type=int, default=10, metavar="N", help="write the generation summaries N generations at a time")
+    parser.add_argument("--full-redraw", action="store_true", help="redraw the whole window every frame instead of only what changed")
+    parser.add_argument("--record", default=None, metavar="PATH", help="record every game played (or generation trained) to a trace file")
+    parser.add_argument("--play-trace", default=None, metavar="PATH", help="replay a recorded game in the window")
+    parser.add_argument("--profile", choices=["stdout", "neat"], default=None, help="time every phase of the game loop and print it after each generation (or game)")
+    parser.add_argument("--profile-csv", default=None, metavar="PATH", help="time every phase of the game loop and append it to a CSV file")
+    args = parser.parse_args()
+    # Traces store the course seed as an unsigned 64-bit number, so any other seed would only fail once the first trace is saved
+    if args.seed is not None and not 0 <= args.seed < 2 ** 64:
+        parser.error("--seed must be between 0 and 2**64 - 1")
+
+    # Profiling stays disabled (and costs next to nothing) unless it was asked for
+    sinks = []
+    if args.profile == "stdout":
+        sinks.append(StdOutSink())
+    elif args.profile == "neat":
+        sinks.append(ProfilingReporter())
+    if args.profile_csv is not None:
+        sinks.append(CSVSink(args.profile_csv))
+    if sinks:
+        PROFILER = Profiler(sinks)
+    if args.model is not None:
+        MODEL_PATH = args.model
+    ALLOW_PICKLE = args.allow_pickle
+    SENSORS = Sensors.from_file(os.path.join(os.path.dirname(__file__), "neatconfig.txt"))
+    TRACE_PATH = args.record
+    DIRTY_RENDERING = not args.full_redraw
+
+    if args.play_trace is not None:
+        trace_game(args.play_trace)
         quit()
-    except:
-        print("An error occurred. Restarting program...")
-        main()
\ No newline at end of file
+
+    # An island-model run is headless, and saves its champion only if it is invincible on every island's courses
+    if args.islands > 0:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        champion, score = run_islands(os.path.join(os.path.dirname(__file__), "neatconfig.txt"), islands=args.islands, seed=args.seed,
+                                      courses=args.courses, migration_every=args.migration_every, migrants=args.migrants)
+        if score > evaluation.MAX_SCORE:
+            save_best_bird(champion)
+        quit()
+
+    multi_course = args.courses > 1 or args.max_steps is not None
+    if args.train or args.headless or args.workers > 0 or args.resume is not None or multi_course:
+        # With nothing to draw, SDL does not need a real display at all
+        if (args.headless and args.render_every == 0) or args.workers > 0 or multi_course:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        # Pressing Q in the window stops training (after saving a checkpoint, if checkpoints are enabled)
+        try:
+            run(os.path.join(os.path.dirname(__file__), "neatconfig.txt"), headless=args.headless, render_every=args.render_every, workers=args.workers,
+                seed=args.seed, vectorised=args.vectorised, cache_size=args.fitness_cache, cache_file=args.fitness_cache_file,
+                checkpoint_every=args.checkpoint_every, checkpoint_seconds=args.checkpoint_seconds, checkpoint_prefix=args.checkpoint_prefix,
+                resume_from=args.resume, courses=args.courses, aggregate=args.aggregate, top_k=args.top_k, max_steps=args.max_steps,
+                stats_file=args.stats, stats_flush_every=args.stats_flush_every)
+        except TrainingStopped:
+            pass
+        quit()
+
+    # If anything goes wrong, the app starts again from the start screen (and closing the window or pressing Q ends it)
+    while True:
+        try:
+            asyncio.run(App().run())
+            break
+        except pygame.error:
+            break
+        except Exception:
+            print("An error occurred. Restarting program...")
+    quit()
\ No newline at end of file
@@ -0,0 +1,268 @@
+# Import required libraries
+import numpy as np
+import pygame
+
+from bird import Bird
+from pipe import Pipe
+from pipe_queue import PipeQueue
+from base import Base
+from world import World, WIN_WIDTH, BIRD_X, BIRD_Y, MAX_SCORE
+from assets import LazyAsset
+from batch_network import BatchNetwork
+from profiling import NULL_PROFILER
+from sensors import Sensors
+
+# The image shown for each value of a bird's img_count in Bird.animate (-1 keeps the image already shown)
+ANIMATION_FRAMES = np.array([0] * Bird.ANIMATION_TIME + [1] * Bird.ANIMATION_TIME + [2] * Bird.ANIMATION_TIME + [1] * Bird.ANIMATION_TIME + [-1, 0])
+FFT_SIZE = 1024 # The length of the transforms in the collision tables, at least as long as a bird and a pipe stacked on top of each other
+SCALAR_BIRDS = 24 # Once this few birds are left, fly_flock hands them over to a World, which steps fewer than about 30 birds faster than NumPy can
+
+# Returns the pixels of a mask as a boolean array with a row per y-coordinate
+def mask_pixels(mask):
+    surface = mask.to_surface(setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 255))
+    return pygame.surfarray.array_red(surface).T > 0
+
+# Returns the Fourier transform of every column of each of the given pixel arrays, as one array indexed by (image, frequency, column)
+def column_spectra(images):
+    return np.fft.rfft(np.array(images, dtype=np.float64), n=FFT_SIZE, axis=1)
+
+# A Flock class that simulates a whole population of birds at once.
+# Instead of one Bird object per genome, the state of every bird is kept in NumPy arrays (one entry per bird),
+# so a single call moves the entire population with exactly the same physics as Bird.move.
+class Flock:
+    BIRD_SPECTRA = LazyAsset(lambda: column_spectra([mask_pixels(mask) for mask in Bird.MASKS])) # The columns of every mask of the bird, transformed
+    PIPE_SPECTRA = LazyAsset(lambda: column_spectra([mask_pixels(Pipe.TOP_MASK)[::-1], mask_pixels(Pipe.BOTTOM_MASK)[::-1]])) # The columns of both halves of a pipe, upside down and transformed
+    COLLISION_TABLES = {} # The collision tables built so far, keyed by (half of the pipe, horizontal offset of the pipe)
+
+    # The constructor for the Flock class, with the number of birds and their shared starting position as explicit parameters.
+    def __init__(self, size, x=BIRD_X, y=BIRD_Y):
+        self.size = size # The number of birds in the flock
+        self.x = x # Birds never move horizontally, so they all share the same x-coordinate
+        self.y = np.full(size, y, dtype=np.float64) # The y-coordinate of every bird
+        self.tilt = np.zeros(size, dtype=np.int64) # The tilt of every bird, in degrees
+        self.tick_count = np.zeros(size, dtype=np.int64) # How long each bird has been moving since it last jumped
+        self.velocity = np.zeros(size, dtype=np.float64) # The velocity of every bird right after its last jump
+        self.height = np.full(size, y, dtype=np.float64) # The y-coordinate of every bird at its last jump
+        self.img_count = np.zeros(size, dtype=np.int64) # How long each bird's current image has been shown for
+        self.img_index = np.zeros(size, dtype=np.int64) # Which of Bird.ASSETS each bird is showing
+        self.alive = np.ones(size, dtype=bool) # Which birds are still flying; dead birds are frozen in place
+
+    # Makes the birds selected by the boolean mask jump, exactly like Bird.jump
+    def jump(self, mask):
+        self.velocity[mask] = Bird.JUMP_VELOCITY
+        self.tick_count[mask] = 0
+        self.height[mask] = self.y[mask]
+
+    # Moves every living bird by one frame, exactly like Bird.move (including the terminal velocity and tilt rules)
+    def move(self):
+        alive = self.alive
+        tick_count = self.tick_count + 1
+        displacement = self.velocity * tick_count + 0.5 * Bird.GRAVITY * (tick_count ** 2) # Δd = viΔt + 0.5a(Δt^2)
+
+        displacement = np.minimum(displacement, Bird.TERMINAL_VELOCITY) # Limit the displacement to the terminal velocity
+        displacement = np.where(displacement < 0, displacement - 2, displacement) # Fine-tune the upwards movement
+        y = self.y + displacement
+
+        # Birds moving up (or still above their jump position) tilt up to MAX_ROTATION; the others gradually tilt down to -90 degrees
+        tilt_up = (displacement < 0) | (y < self.height + 50)
+        tilt = np.where(tilt_up,
+                        np.where(self.tilt < Bird.MAX_ROTATION, Bird.MAX_ROTATION, self.tilt),
+                        np.where(self.tilt > -90, self.tilt - Bird.ROTATION_VEL, self.tilt))
+
+        # Only the living birds are updated
+        self.tick_count = np.where(alive, tick_count, self.tick_count)
+        self.y = np.where(alive, y, self.y)
+        self.tilt = np.where(alive, tilt, self.tilt)
+
+    # Advances the flapping animation of every living bird by one step, exactly like Bird.animate
+    def animate(self):
+        alive = self.alive
+        img_count = self.img_count + 1
+        t = Bird.ANIMATION_TIME
+        # Wings up, at the side, down, at the side, and back up again; the count of 4 * ANIMATION_TIME keeps the previous image (-1)
+        img_index = ANIMATION_FRAMES[img_count]
+        img_index = np.where(img_index < 0, self.img_index, img_index)
+        img_count = np.where(img_count == t * 4 + 1, 0, img_count)
+
+        # A bird tilted almost completely downwards stops flapping, with its wings at its side
+        diving = self.tilt <= -80
+        img_index = np.where(diving, 1, img_index)
+        img_count = np.where(diving, t * 2, img_count)
+
+        # Only the living birds are updated
+        self.img_count = np.where(alive, img_count, self.img_count)
+        self.img_index = np.where(alive, img_index, self.img_index)
+
+    # Returns the collision table of one half of a pipe (0 for the top, 1 for the bottom) that is dx pixels to the right of the birds.
+    # Row i of the table says, for every vertical offset dy of the pipe's mask from the bird's (at index dy + pipe_height - 1), whether
+    # the mask of Bird.MASKS[i] overlaps it. The overlaps at every offset are the correlation of the masks' columns, found with one FFT,
+    # and every table is built once and shared by every bird and every flock, since the pipes always take the same horizontal steps.
+    @classmethod
+    def collision_table(cls, half, dx):
+        key = (half, dx)
+        table = cls.COLLISION_TABLES.get(key)
+        if table is None:
+            bird_width, bird_height = Bird.MASKS[0].get_size()
+            pipe_width, pipe_height = Pipe.TOP_MASK.get_size()
+            first, last = max(0, dx), min(bird_width, dx + pipe_width) # The columns of the bird the pipe is level with
+            spectrum = (cls.BIRD_SPECTRA[:, :, first:last] * cls.PIPE_SPECTRA[half, :, first - dx:last - dx]).sum(axis=2)
+            overlaps = np.fft.irfft(spectrum, n=FFT_SIZE, axis=1)[:, :bird_height + pipe_height - 1]
+            table = cls.COLLISION_TABLES[key] = overlaps > 0.5 # The overlaps are whole numbers of pixels, give or take rounding errors
+        return table
+
+    # Returns a boolean array of the living birds that overlap the given pipe, giving the same answer as Pipe.collide for every bird at once
+    def collide(self, pipe):
+        hits = np.zeros(self.size, dtype=bool)
+        bird_width, bird_height = Bird.MASKS[0].get_size() # Every image of the bird has the same size
+        pipe_width, pipe_height = pipe.TOP_MASK.get_size()
+
+        # If the pipe is not level with the flock, no bird can touch it
+        if self.x + bird_width <= pipe.x or pipe.x + pipe_width <= self.x:
+            return hits
+
+        # Each bird's overlap with each half of the pipe is looked up in the collision table of its image, by its offset from that half
+        rounded_y = np.rint(self.y).astype(np.int64) # np.rint rounds halves to even, just like round() does in Pipe.collide
+        for half, pipe_y in enumerate((pipe.top_pipe, pipe.bottom_pipe)):
+            table = self.collision_table(half, pipe.x - self.x)
+            offsets = pipe_y - rounded_y + pipe_height - 1
+            level = (offsets >= 0) & (offsets < table.shape[1]) # The birds whose box overlaps this half vertically
+            hits |= level & table[self.img_index, np.clip(offsets, 0, table.shape[1] - 1)]
+        return hits & self.alive
+
+    # Drops the dead birds from the flock, so later frames only spend time on the birds still flying
+    # Returns the index (in the flock before compacting) of every bird kept
+    def compact(self):
+        keep = np.flatnonzero(self.alive)
+        for name in ("y", "tilt", "tick_count", "velocity", "height", "img_count", "img_index", "alive"):
+            setattr(self, name, getattr(self, name)[keep])
+        self.size = len(keep)
+        return keep
+
+    # Returns a boolean array of the living birds that hit the ground or flew off the top of the screen
+    def out_of_bounds(self, base):
+        return self.alive & ((self.y + Bird.ASSETS[0].get_height() >= base.y) | (self.y < 0))
+
+    # Returns a Bird object for every bird in the flock, in the same state, so a World can carry on flying them
+    def to_birds(self):
+        birds = []
+        for i in range(self.size):
+            bird = Bird(self.x, float(self.y[i]))
+            bird.tilt = int(self.tilt[i])
+            bird.tick_count = int(self.tick_count[i])
+            bird.velocity = float(self.velocity[i])
+            bird.height = float(self.height[i])
+            bird.img_count = int(self.img_count[i])
+            bird.img = Bird.ASSETS[self.img_index[i]]
+            birds.append(bird)
+        return birds
+
+# Flies one bird per neural network over the same pipe course, all in lock-step, step for step like a World does.
+# The pipe heights are taken in order from the given Course, and the networks read the flock through the given sensors (the default sensors if none are given).
+# Returns the fitness of every bird (rewarded exactly as in gen_training), the final score and the indices of the birds still flying.
+# Once no more than SCALAR_BIRDS birds are left, they are handed over to a World and flown one by one (see fly_world).
+# The profiler, if given, times the phases of every frame.
+def fly_flock(neural_networks, course, max_score=MAX_SCORE, profiler=NULL_PROFILER, sensors=None):
+    heights = iter(course) # The heights of the pipes, in order
+    sensors = Sensors() if sensors is None else sensors
+    flock = Flock(len(neural_networks)) # Initialize one bird per neural network
+    batch_network = BatchNetwork(neural_networks) # Compile the networks so the whole flock is evaluated at once
+    fitness = np.zeros(flock.size) # The fitness of every bird
+    base = Base() # Initialize the base
+    pipes = PipeQueue(flock.x) # Keeps track of the current pipes, ordered by x
+    pipes.spawn(WIN_WIDTH, next(heights))
+    bird_width = Bird.ASSETS[0].get_width() # Every image of the bird has the same width
+    score = 0 # The number of pipes passed by the flock
+    ids = np.arange(flock.size) # The neural network (and fitness) of each bird in the flock, which changes as dead birds are dropped
+    jumps = np.zeros(flock.size, dtype=bool) # Which birds jump this frame, reused every frame
+
+    while flock.alive.any():
+        living = np.flatnonzero(flock.alive) # The birds still flying
+        fitness[ids[living]] += 0.1 # The living birds are rewarded for every frame they stay alive
+        with profiler.phase("move"):
+            flock.move() # Move the whole flock at once
+            flock.animate()
+
+        # The neural networks of all the living birds decide at once whether each bird should jump
+        with profiler.phase("activate"):
+            inputs = sensors.read(flock.y[living], flock.velocity[living], flock.tick_count[living], pipes)
+            nn_output = batch_network.activate(inputs, ids[living])
+            jumps.fill(False)
+            jumps[living] = nn_output[:, 0] > 0.5
+            flock.jump(jumps)
+
+        # The pipe can only be passed while there are birds left to pass it
+        any_alive = flock.alive.any()
+        with profiler.phase("collide"):
+            # Only the pipes level with the flock can be hit: hitting one kills the bird and is penalised
+            for pipe in pipes.overlapping(flock.x, flock.x + bird_width):
+                hits = flock.collide(pipe)
+                fitness[ids[hits]] -= 1
+                flock.alive &= ~hits
+
+            # If the flock has passed the next pipe and it has not been passed before, we need a new pipe
+            add_pipe = any_alive and pipes.pass_pipe()
+
+        with profiler.phase("cull"):
+            pipes.cull() # Remove the pipes that are completely off the screen
+            pipes.move() # Move the pipes leftward
+
+            # Passing a pipe increments the score and rewards every bird still flying
+            if add_pipe:
+                score += 1
+                fitness[ids[flock.alive]] += 5
+                pipes.spawn(WIN_WIDTH, next(heights))
+
+            # Hitting the ground or flying off the top of the screen kills the bird
+            flock.alive &= ~flock.out_of_bounds(base)
+
+            # Once half the flock is dead, drop the dead birds (so the flock shrinks by half at most log2(size) times)
+            if np.count_nonzero(flock.alive) <= flock.size // 2:
+                ids = ids[flock.compact()]
+                jumps = np.zeros(flock.size, dtype=bool)
+
+        base.move() # Call the move method defined for a base object
+        profiler.end_frame()
+
+        # The surviving birds are invincible, so the flight is over
+        if score > max_score:
+            break
+
+        # Once only a handful of birds are left, stepping them one by one is faster than the flock, so they finish the course in a World
+        if 0 < np.count_nonzero(flock.alive) <= SCALAR_BIRDS:
+            ids = ids[flock.compact()]
+            world = World(0, course.seed, profiler)
+            world.birds = flock.to_birds()
+            world.alive = list(range(flock.size))
+            world.heights, world.pipes, world.base, world.score = heights, pipes, base, score
+            return fly_world(world, [neural_networks[i] for i in ids], fitness, ids, max_score, sensors)
+
+    return fitness, score, ids[flock.alive]
+
+# Carries on flying the birds of a World (the last few birds of a flock), where bird i is flown by neural_networks[i] and rewarded in fitness[ids[i]].
+# Returns the fitness, the final score and the indices of the birds still flying, just like fly_flock.
+def fly_world(world, neural_networks, fitness, ids, max_score, sensors):
+    # Each living bird's neural network decides whether it should jump, reading the same list of inputs refilled for every bird
+    inputs = [0.0] * sensors.size
+    def think(next_pipe):
+        for i in world.alive:
+            bird = world.birds[i]
+            if neural_networks[i].activate(sensors.read_into(inputs, bird, next_pipe, world.pipes))[0] > 0.5:
+                bird.jump()
+
+    while world.alive:
+        # The birds are rewarded exactly as in gen_training: +0.1 for each step alive, -1 for hitting a pipe and +5 for passing one
+        for i in world.alive:
+            fitness[ids[i]] += 0.1
+        crashed, passed, fell = world.step(think)
+        for i in crashed:
+            fitness[ids[i]] -= 1
+        if passed:
+            for i in world.alive + fell:
+                fitness[ids[i]] += 5
+        world.profiler.end_frame()
+
+        # The surviving birds are invincible, so the flight is over
+        if world.score > max_score:
+            break
+
+    return fitness, world.score, ids[world.alive]
@@ -0,0 +1,115 @@
+"""
+A compact binary format for recorded games, so any game (played by the user, by a trained bird or by a whole generation in training)
+can be replayed exactly: headless at full speed, or drawn in the window.
+Since a course is generated from its seed and the World steps deterministically, a trace only needs the seed and, for every step,
+one bit per bird saying whether it jumped. A game of several thousand steps fits in a few hundred bytes.
+The final score and number of steps are stored too, so replaying a trace also checks the physics still behave the same.
+
+    python game_trace.py game.fbt [more.fbt ...]    # Replays every trace headless and checks it still ends the same way
+"""
+
+# Import required libraries
+import os
+import struct
+import numpy as np
+
+from atomic_file import atomic_write
+from world import World
+from profiling import NULL_PROFILER
+
+MAGIC = b"FBTR" # The first four bytes of every trace file
+VERSION = 1 # The version of the format written by TraceRecorder.save
+HEADER = struct.Struct("<4sIIQII") # Magic, version, number of birds, course seed, number of steps and final score
+
+# A TraceRecorder class that records which birds of a World jump at every step.
+# The think function given to World.step is wrapped so that, once the player or networks have decided, the jumps are read from the birds
+# (a bird that has just jumped is the only one whose tick_count is 0, since moving always increments it).
+class TraceRecorder:
+
+    # The constructor for the TraceRecorder class, with the World being played as an explicit parameter
+    def __init__(self, world):
+        self.world = world
+        self.bits = bytearray() # One byte per bird per step (1 if it jumped), packed into bits when saved
+
+    # Returns a think function for World.step that calls think and then records the jumps it made
+    def wrap(self, think):
+        world = self.world
+        num_birds = len(world.birds)
+        bits = self.bits
+
+        def recording_think(next_pipe):
+            if think is not None:
+                think(next_pipe)
+            start = len(bits)
+            bits.extend(bytes(num_birds))
+            # Only the living birds can jump; a dead bird keeps whatever tick_count it died with
+            for i in world.alive:
+                if world.birds[i].tick_count == 0:
+                    bits[start + i] = 1
+        return recording_think
+
+    # Saves the game recorded so far as a trace file, written atomically like a model file
+    def save(self, path):
+        world = self.world
+        steps = len(self.bits) // len(world.birds)
+        with atomic_write(path) as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(world.birds), world.seed, steps, world.score))
+            f.write(np.packbits(np.frombuffer(bytes(self.bits), dtype=np.uint8)).tobytes())
+
+# A Trace class that holds a game loaded from a trace file
+class Trace:
+
+    # The constructor for the Trace class, with the path of a trace file as an explicit parameter
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, num_birds, seed, steps, score = HEADER.unpack(data[:HEADER.size])
+        if magic != MAGIC:
+            raise ValueError("{0} is not a trace file".format(path))
+        if version > VERSION:
+            raise ValueError("{0} was saved by a newer version of the trace format ({1})".format(path, version))
+        self.num_birds = num_birds # The number of birds in the game
+        self.seed = seed # The seed of the course the game was played on
+        self.steps = steps # The number of steps the game lasted
+        self.score = score # The score the game ended with
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8, offset=HEADER.size), count=steps * num_birds)
+        self.jumps = bits.reshape(steps, num_birds).astype(bool) # Whether each bird jumped at each step
+
+    # Returns a new World for the game, and a think function for World.step that makes the birds jump exactly as they did when it was recorded
+    # The profiler, if given, times the phases of every step
+    def world(self, profiler=NULL_PROFILER):
+        world = World(self.num_birds, self.seed, profiler)
+        jumps = self.jumps
+
+        def think(next_pipe):
+            step = world.steps
+            if step < len(jumps):
+                for i in world.alive:
+                    if jumps[step, i]:
+                        world.birds[i].jump()
+        return world, think
+
+    # Replays the whole game headless, as fast as possible, and returns the World as it was at the end
+    def replay(self):
+        world, think = self.world()
+        while world.alive and world.steps < self.steps:
+            world.step(think)
+        return world
+
+if __name__ == '__main__':
+    import argparse
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Nothing is drawn, so SDL does not need a real display
+    parser = argparse.ArgumentParser(description="Replay trace files headless and check they still end the same way")
+    parser.add_argument("traces", nargs="+", help="the trace files to replay")
+    args = parser.parse_args()
+
+    failures = 0
+    for path in args.traces:
+        trace = Trace(path)
+        world = trace.replay()
+        same = world.steps == trace.steps and world.score == trace.score
+        failures += not same
+        print("{0}: {1} birds, seed {2}, recorded {3} steps and score {4}, replayed {5} steps and score {6} ({7})".format(
+            path, trace.num_birds, trace.seed, trace.steps, trace.score, world.steps, world.score, "ok" if same else "MISMATCH"))
+    raise SystemExit(1 if failures else 0)
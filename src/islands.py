@@ -0,0 +1,174 @@
+# Import required libraries
+import os
+import queue
+import random
+from multiprocessing import Process, Queue
+import neat
+
+from course import Course
+from flock import fly_flock
+import evaluation
+from sensors import Sensors
+
+MIGRATION_TIMEOUT = 60 # How long (in seconds) an island waits for migrants before carrying on without them (e.g. if its neighbour was killed)
+NO_MORE_MIGRANTS = None # Sent by an island once it has stopped evolving, so the next island stops waiting for its migrants
+
+# An Island class that is the fitness function of one island of an island-model run.
+# Every genome flies the island's own courses (with the vectorised flock), and every migration_every generations the island sends copies
+# of its migrants best genomes to the next island in the ring and takes in the best genomes of the previous one.
+# Migrants are flown over this island's courses and then take the place of its worst genomes: their genes are copied into the worst genomes
+# in place, so each keeps its key and species and NEAT carries on as if the migrant had been bred here.
+class Island:
+
+    # The constructor for the Island class, with the island's index, course seeds, and the queues it receives and sends migrants on
+    def __init__(self, index, seeds, inbox, outbox, migration_every=5, migrants=2, sensors=None):
+        self.index = index # The position of the island in the ring
+        self.seeds = seeds # The seeds of the courses every genome of this island flies
+        self.sensors = Sensors() if sensors is None else sensors # What the birds' networks read the world through
+        self.inbox = inbox # Receives the migrants of the previous island
+        self.outbox = outbox # Sends migrants to the next island
+        self.migration_every = migration_every # The number of generations between migrations
+        self.migrants = migrants # The number of genomes sent (and received) at each migration
+        self.generation = 0 # The number of generations evaluated so far
+        self.received = 0 # The number of migrants taken in so far
+        self.neighbour_done = False # Whether the previous island has stopped evolving, so no more migrants will arrive
+
+    # Returns the fitness of every network: the mean of the fitness earned on each of the island's courses
+    def fly(self, neural_networks):
+        total = 0
+        for seed in self.seeds:
+            fitness, _, _ = fly_flock(neural_networks, Course.get(seed), sensors=self.sensors)
+            total = total + fitness
+        return total / len(self.seeds)
+
+    # Evaluates a generation of genomes, in the form expected by neat.Population.run, then migrates if it is time to
+    def evaluate(self, genomes, config):
+        neural_networks = [neat.nn.FeedForwardNetwork.create(genome, config) for _, genome in genomes]
+        for (_, genome), fitness in zip(genomes, self.fly(neural_networks)):
+            genome.fitness = float(fitness)
+
+        self.generation += 1
+        if self.migrants > 0 and self.generation % self.migration_every == 0:
+            self.migrate(genomes, config)
+
+    # Sends this island's best genomes to the next island, and puts the previous island's best genomes in the place of this island's worst
+    def migrate(self, genomes, config):
+        ranked = sorted((genome for _, genome in genomes), key=lambda genome: genome.fitness, reverse=True)
+        self.outbox.put(ranked[:self.migrants])
+        if self.neighbour_done:
+            return
+        try:
+            arrivals = self.inbox.get(timeout=MIGRATION_TIMEOUT)
+        except queue.Empty:
+            return
+        if arrivals is NO_MORE_MIGRANTS:
+            self.neighbour_done = True
+            return
+
+        arrivals = arrivals[:max(len(ranked) - self.migrants, 0)] # The genomes just sent away are never replaced
+        neural_networks = [neat.nn.FeedForwardNetwork.create(migrant, config) for migrant in arrivals]
+        for resident, migrant, fitness in zip(reversed(ranked), arrivals, self.fly(neural_networks)):
+            self.naturalise(migrant, resident, config)
+            resident.fitness = float(fitness)
+            self.received += 1
+
+    # Copies the genes of a migrant into a resident genome.
+    # Each island numbers its new hidden nodes with its own counter, so the migrant's hidden nodes are given fresh keys from this island's counter;
+    # otherwise they could clash with nodes this island creates later (which NEAT does not allow)
+    @staticmethod
+    def naturalise(migrant, resident, config):
+        output_keys = set(config.genome_config.output_keys)
+        keys = {key: config.genome_config.get_new_node_key(resident.nodes) for key in migrant.nodes if key not in output_keys}
+        nodes = {}
+        for key, node in migrant.nodes.items():
+            node.key = keys.get(key, key)
+            nodes[node.key] = node
+        connections = {}
+        for (source, target), connection in migrant.connections.items():
+            connection.key = (keys.get(source, source), keys.get(target, target))
+            connections[connection.key] = connection
+        resident.nodes = nodes
+        resident.connections = connections
+
+# A NEAT reporter that prints one line per generation for an island, so the islands' reports do not drown each other out
+class IslandReporter(neat.reporting.BaseReporter):
+
+    # The constructor for the IslandReporter class, with the island it reports on as an explicit parameter
+    def __init__(self, island):
+        self.island = island
+        self.generation = None # The generation being evaluated
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        fitnesses = [genome.fitness for genome in population.values()]
+        print("Island {0} generation {1}: best fitness {2:.1f}, average {3:.1f}, {4} species, {5} migrants received".format(
+            self.island.index, self.generation, best_genome.fitness, sum(fitnesses) / len(fitnesses), len(species.species), self.island.received))
+
+# Runs in a process of its own: evolves one island's population for the given number of generations, then sends back the best genome it found
+def run_island(config_file, index, seed, courses, generations, inbox, outbox, results, migration_every, migrants):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Nothing is drawn, so SDL does not need a real display
+    random.seed(seed) # NEAT draws from the global random module, so each island starts from a different population
+
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
+    sensors = Sensors.from_file(config_file)
+    sensors.configure(config)
+    config.course_seed = seed
+    island = Island(index, Course.seeds(seed, courses), inbox, outbox, migration_every, migrants, sensors)
+    population = neat.Population(config)
+    population.add_reporter(IslandReporter(island))
+    try:
+        winner = population.run(island.evaluate, generations)
+    finally:
+        # However this island stops, the next one must not keep waiting for its migrants
+        outbox.put(NO_MORE_MIGRANTS)
+        # Migrants the next island never collects must not keep this process from exiting
+        outbox.cancel_join_thread()
+    results.put((index, winner, island.received))
+
+# Evolves islands populations at once, each in its own process and on its own courses (courses courses derived from a seed of its own),
+# with the islands arranged in a ring: every migration_every generations, each island sends its migrants best genomes to the next one.
+# This process only coordinates: it starts the islands, collects the best genome of each and flies them all over every island's courses.
+# Returns the neural network of the best of them (by its mean fitness over every course) and the fewest pipes it passed on any course.
+def run_islands(config_file, islands=4, seed=None, courses=1, generations=64, migration_every=5, migrants=2):
+    seed = Course.random_seed() if seed is None else seed
+    island_seeds = Course.seeds(seed, islands)
+    if islands < 2:
+        migrants = 0 # A lone island has no one to trade with
+
+    inboxes = [Queue() for _ in range(islands)] # The migrants sent to each island
+    results = Queue() # The best genome of each island, once it has finished
+    processes = [Process(target=run_island, args=(config_file, i, island_seeds[i], courses, generations, inboxes[i], inboxes[(i + 1) % islands],
+                                                  results, migration_every, migrants)) for i in range(islands)]
+    for process in processes:
+        process.start()
+
+    # Collect the results before joining, so no island blocks on a full results queue; an island that crashed just never reports
+    winners = []
+    while len(winners) < islands:
+        try:
+            winners.append(results.get(timeout=1))
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes) and results.empty():
+                break
+    for process in processes:
+        process.join()
+    if not winners:
+        raise RuntimeError("Every island failed")
+
+    # The champion is the island winner that flies best over every island's courses, not just its own
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
+    sensors = Sensors.from_file(config_file)
+    sensors.configure(config)
+    all_seeds = [course_seed for island_seed in island_seeds for course_seed in Course.seeds(island_seed, courses)]
+    best = None
+    for index, genome, received in sorted(winners, key=lambda winner: winner[0]):
+        neural_network = neat.nn.FeedForwardNetwork.create(genome, config)
+        fitness, _ = evaluation.fly_courses(neural_network, all_seeds, sensors=sensors)
+        score = min(evaluation.fly(neural_network, course_seed, sensors=sensors)[1] for course_seed in all_seeds)
+        print("Island {0}: best genome {1} has a mean fitness of {2:.1f} over all {3} courses and passes at least {4} pipes ({5} migrants received)".format(
+            index, genome.key, fitness, len(all_seeds), score, received))
+        if best is None or fitness > best[0]:
+            best = (fitness, neural_network, score)
+    return best[1], best[2]
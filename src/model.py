@@ -0,0 +1,269 @@
+"""
+A compact binary format for trained birds, and a tiny inference runtime for it that only needs NumPy.
+A model file holds everything needed to run a feed-forward network (its node order, weights, biases, responses, activations
+and aggregations) in flat little-endian arrays, so it can be memory-mapped and used straight away, without importing neat
+or unpickling anything. Saved birds therefore keep working whatever version of neat-python (if any) is installed.
+
+    python model.py best_bird.pickle best_bird.fbm    # Converts a pickled neat.nn.FeedForwardNetwork (only convert birds you trust)
+"""
+
+# Import required libraries
+import math
+import struct
+from functools import reduce
+from operator import mul
+import numpy as np
+
+from atomic_file import atomic_write
+
+MAGIC = b"FBNN" # The first four bytes of every model file
+VERSION = 1 # The version of the format written by save_model
+HEADER = struct.Struct("<4sIIIII8x") # Magic, version, number of inputs, outputs, nodes and links, padded to 32 bytes so the arrays are aligned
+
+# NumPy versions of NEAT's built-in activation functions, keyed by the name NEAT gives them, working on a whole array of values at once.
+# Each one mirrors the clamping of the original in neat.activations, so the results match neat's activate() within float tolerance.
+def _inv(z):
+    result = np.zeros_like(z)
+    np.divide(1.0, z, out=result, where=z != 0) # NEAT returns 0 instead of failing on a division by zero
+    return result
+
+ACTIVATIONS = {
+    "sigmoid": lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    "tanh": lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    "sin": lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    "gauss": lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2),
+    "relu": lambda z: np.where(z > 0.0, z, 0.0),
+    "softplus": lambda z: 0.2 * np.log(1 + np.exp(np.clip(5.0 * z, -60.0, 60.0))),
+    "identity": lambda z: z,
+    "clamped": lambda z: np.clip(z, -1.0, 1.0),
+    "inv": _inv,
+    "log": lambda z: np.log(np.maximum(z, 1e-7)),
+    "exp": lambda z: np.exp(np.clip(z, -60.0, 60.0)),
+    "abs": np.abs,
+    "hat": lambda z: np.maximum(0.0, 1 - np.abs(z)),
+    "square": lambda z: z ** 2,
+    "cube": lambda z: z ** 3,
+}
+
+# NumPy versions of NEAT's built-in aggregation functions, combining the weighted inputs of a node (one row per network input row)
+AGGREGATIONS = {
+    "sum": lambda x: np.sum(x, axis=1),
+    "product": lambda x: np.prod(x, axis=1),
+    "max": lambda x: np.max(x, axis=1),
+    "min": lambda x: np.min(x, axis=1),
+    "maxabs": lambda x: x[np.arange(len(x)), np.argmax(np.abs(x), axis=1)],
+    "median": lambda x: np.median(x, axis=1),
+    "mean": lambda x: np.mean(x, axis=1),
+}
+
+# Plain Python versions of the same functions, for a single row of inputs, where NumPy's overhead on every node would cost far more than the maths.
+# They are copies of the originals in neat.activations and neat.aggregations (so the results are exactly the same), without needing neat installed.
+def _scalar_inv(z):
+    try:
+        return 1.0 / z
+    except ArithmeticError:
+        return 0.0
+
+def _scalar_mean(x):
+    return sum(map(float, x)) / len(x)
+
+def _scalar_median(x):
+    n = len(x)
+    if n <= 2:
+        return _scalar_mean(x)
+    x = sorted(x)
+    return x[n // 2] if n % 2 == 1 else (x[n // 2 - 1] + x[n // 2]) / 2.0
+
+SCALAR_ACTIVATIONS = {
+    "sigmoid": lambda z: 1.0 / (1.0 + math.exp(-max(-60.0, min(60.0, 5.0 * z)))),
+    "tanh": lambda z: math.tanh(max(-60.0, min(60.0, 2.5 * z))),
+    "sin": lambda z: math.sin(max(-60.0, min(60.0, 5.0 * z))),
+    "gauss": lambda z: math.exp(-5.0 * max(-3.4, min(3.4, z)) ** 2),
+    "relu": lambda z: z if z > 0.0 else 0.0,
+    "softplus": lambda z: 0.2 * math.log(1 + math.exp(max(-60.0, min(60.0, 5.0 * z)))),
+    "identity": lambda z: z,
+    "clamped": lambda z: max(-1.0, min(1.0, z)),
+    "inv": _scalar_inv,
+    "log": lambda z: math.log(max(1e-7, z)),
+    "exp": lambda z: math.exp(max(-60.0, min(60.0, z))),
+    "abs": abs,
+    "hat": lambda z: max(0.0, 1 - abs(z)),
+    "square": lambda z: z ** 2,
+    "cube": lambda z: z ** 3,
+}
+
+SCALAR_AGGREGATIONS = {
+    "sum": sum,
+    "product": lambda x: reduce(mul, x, 1.0),
+    "max": max,
+    "min": min,
+    "maxabs": lambda x: max(x, key=abs),
+    "median": _scalar_median,
+    "mean": _scalar_mean,
+}
+
+# The id each activation and aggregation is stored as; new names must only ever be added at the end
+ACTIVATION_NAMES = list(ACTIVATIONS)
+AGGREGATION_NAMES = list(AGGREGATIONS)
+
+# Returns the name NEAT registers one of its built-in functions under, e.g. "tanh" for neat.activations.tanh_activation
+def _function_name(function, suffix):
+    name = function.__name__
+    return name[:-len(suffix)] if name.endswith(suffix) else name
+
+# Returns the bytes of the model file for a neat.nn.FeedForwardNetwork (or anything with the same input_nodes, output_nodes and node_evals).
+# Only NEAT's built-in activation and aggregation functions can be saved; a network using a custom one raises a ValueError.
+def model_bytes(neural_network):
+    num_inputs = len(neural_network.input_nodes)
+    slots = {key: slot for slot, key in enumerate(neural_network.input_nodes)} # The position of every value: the inputs, then each node in order
+
+    bias, response, weights, activation, aggregation, link_start, link_source = [], [], [], [], [], [0], []
+    for node, act_func, agg_func, node_bias, node_response, links in neural_network.node_evals:
+        act_name = _function_name(act_func, "_activation")
+        agg_name = _function_name(agg_func, "_aggregation")
+        if act_name not in ACTIVATIONS or agg_name not in AGGREGATIONS:
+            raise ValueError("Node {0} uses a custom activation or aggregation ({1}, {2}) that cannot be saved".format(node, act_name, agg_name))
+        slots[node] = len(slots)
+        bias.append(node_bias)
+        response.append(node_response)
+        activation.append(ACTIVATION_NAMES.index(act_name))
+        aggregation.append(AGGREGATION_NAMES.index(agg_name))
+        for i, w in links:
+            link_source.append(slots[i])
+            weights.append(w)
+        link_start.append(len(link_source))
+
+    # An output that is never evaluated reads the value after the last node, which is always 0 (as in neat's activate())
+    num_nodes = len(neural_network.node_evals)
+    output_slots = [slots.get(key, num_inputs + num_nodes) for key in neural_network.output_nodes]
+
+    parts = [HEADER.pack(MAGIC, VERSION, num_inputs, len(output_slots), num_nodes, len(link_source))]
+    # The 8-byte arrays come first, so every array stays aligned when the file is memory-mapped
+    for values, dtype in ((bias, "<f8"), (response, "<f8"), (weights, "<f8"), (activation, "<i4"), (aggregation, "<i4"),
+                          (link_start, "<i4"), (link_source, "<i4"), (output_slots, "<i4")):
+        parts.append(np.asarray(values, dtype=dtype).tobytes())
+    return b"".join(parts)
+
+# Saves a neat.nn.FeedForwardNetwork as a model file (see model_bytes).
+# The file is written atomically, so a crash never leaves a half-written model behind.
+def save_model(neural_network, path):
+    with atomic_write(path) as f:
+        f.write(model_bytes(neural_network))
+
+# A Model class that runs a network loaded from a model file.
+# Like neat's FeedForwardNetwork, it evaluates the nodes in their saved order: a single row in plain Python (slightly faster than neat itself),
+# or a whole batch of input rows at once with NumPy.
+class Model:
+
+    # The constructor for the Model class, with the path of a model file as an explicit parameter
+    # By default the file is memory-mapped, so loading is instant and processes running the same model share its pages
+    # If data is given, the model is read from that buffer instead (e.g. a slice of shared memory), and path only names it in errors
+    def __init__(self, path, mmap=True, data=None):
+        self.path = path
+        if data is not None:
+            data = np.frombuffer(data, dtype=np.uint8)
+        elif mmap:
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            with open(path, "rb") as f:
+                data = np.frombuffer(f.read(), dtype=np.uint8)
+
+        magic, version, num_inputs, num_outputs, num_nodes, num_links = HEADER.unpack(bytes(data[:HEADER.size]))
+        if magic != MAGIC:
+            raise ValueError("{0} is not a model file".format(path))
+        if version > VERSION:
+            raise ValueError("{0} was saved by a newer version of the model format ({1})".format(path, version))
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+
+        # Every array is a view of the file itself, so nothing is copied
+        offset = HEADER.size
+        def array(count, dtype):
+            nonlocal offset
+            size = count * np.dtype(dtype).itemsize
+            values = data[offset:offset + size].view(dtype)
+            offset += size
+            return values
+        self.bias = array(num_nodes, "<f8")
+        self.response = array(num_nodes, "<f8")
+        self.weights = array(num_links, "<f8")
+        self.activation = array(num_nodes, "<i4")
+        self.aggregation = array(num_nodes, "<i4")
+        self.link_start = array(num_nodes + 1, "<i4")
+        self.link_source = array(num_links, "<i4")
+        self.output_slots = array(num_outputs, "<i4")
+
+        # Each node, ready to evaluate: its slot, activation, aggregation, bias, response, and the slots and weights of its inputs
+        self.nodes = []
+        for j in range(num_nodes):
+            start, end = self.link_start[j], self.link_start[j + 1]
+            self.nodes.append((num_inputs + j, ACTIVATIONS[ACTIVATION_NAMES[self.activation[j]]], AGGREGATIONS[AGGREGATION_NAMES[self.aggregation[j]]],
+                               float(self.bias[j]), float(self.response[j]), self.link_source[start:end], self.weights[start:end]))
+        self.num_slots = num_inputs + num_nodes + 1 # The last slot is always 0
+
+        # The same nodes with plain Python numbers and functions, for activating a single row (see activate_row)
+        self.row_nodes = []
+        for j in range(num_nodes):
+            start, end = self.link_start[j], self.link_start[j + 1]
+            self.row_nodes.append((num_inputs + j, SCALAR_ACTIVATIONS[ACTIVATION_NAMES[self.activation[j]]],
+                                   SCALAR_AGGREGATIONS[AGGREGATION_NAMES[self.aggregation[j]]], float(self.bias[j]), float(self.response[j]),
+                                   list(zip(self.link_source[start:end].tolist(), self.weights[start:end].tolist()))))
+        self.row_outputs = self.output_slots.tolist()
+        self.row_values = [0.0] * self.num_slots # The value of every slot while a single row is activated, reused by every call
+
+    # Activates the network on a single row of inputs, node by node in plain Python exactly like neat's activate(), returning the list of outputs
+    def activate_row(self, inputs):
+        if len(inputs) != self.num_inputs:
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(self.num_inputs, len(inputs)))
+        values = self.row_values
+        values[:self.num_inputs] = inputs
+        for slot, activation, aggregation, bias, response, links in self.row_nodes:
+            values[slot] = activation(bias + response * aggregation([values[i] * w for i, w in links]))
+        return [values[i] for i in self.row_outputs]
+
+    # Activates the network on one row of inputs (returning a list of outputs, like neat's activate()) or on a 2-D batch of rows
+    # (returning one row of outputs per row of inputs)
+    def activate(self, inputs):
+        if isinstance(inputs, np.ndarray):
+            if inputs.ndim == 1:
+                return self.activate_row(inputs.tolist())
+        elif not inputs or not hasattr(inputs[0], "__len__"):
+            return self.activate_row(inputs)
+        inputs = np.asarray(inputs, dtype=np.float64)
+        single = inputs.ndim == 1
+        rows = inputs.reshape(1, -1) if single else inputs
+        if rows.shape[1] != self.num_inputs:
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(self.num_inputs, rows.shape[1]))
+
+        values = np.zeros((len(rows), self.num_slots))
+        values[:, :self.num_inputs] = rows
+        for slot, activation, aggregation, bias, response, sources, weights in self.nodes:
+            values[:, slot] = activation(bias + response * aggregation(values[:, sources] * weights))
+
+        outputs = values[:, self.output_slots]
+        return outputs[0].tolist() if single else outputs
+
+# Loads the bird saved at path, which has an activate(inputs) method returning the list of outputs.
+# Birds saved before model files existed are pickled neat.nn.FeedForwardNetworks, and unpickling a file runs whatever code it names,
+# so they are only loaded if allow_pickle is True (for files you trust). Otherwise a file that is not a model file raises a ValueError,
+# and an old bird can be converted into a model file once (see above).
+def load_bird(path, allow_pickle=False):
+    with open(path, "rb") as f:
+        is_model = f.read(len(MAGIC)) == MAGIC
+    if is_model:
+        return Model(path)
+    if not allow_pickle:
+        raise ValueError("{0} is not a model file (a bird pickled by an older version of the game can be converted with: python model.py {0} <model file>)".format(path))
+    import pickle # Only old birds need unpickling (and neat installed)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+if __name__ == '__main__':
+    import argparse
+    import pickle
+    parser = argparse.ArgumentParser(description="Convert a pickled neat.nn.FeedForwardNetwork into a model file")
+    parser.add_argument("pickle", help="the pickled network, e.g. best_bird.pickle")
+    parser.add_argument("model", help="the model file to write, e.g. best_bird.fbm")
+    args = parser.parse_args()
+    with open(args.pickle, "rb") as f:
+        save_model(pickle.load(f), args.model)
@@ -1,60 +1,75 @@
 # Import required libraries
-import pygame
-import os
-from os.path import dirname, abspath
-import random
-
 from Game import Game
+import assets
+from assets import LazyAsset
 
-imgs_path = dirname(dirname(abspath(__file__)))
-# A Pipe class that handles the creation and behaviour of the pipe, as well as collision mechanics.
-PIPE_ASSET = pygame.transform.scale2x(pygame.image.load(os.path.join(imgs_path, "imgs", "pipe.png"))) # Load in required images and double their size
 # A Pipe class to make the creation and handling of the pipes and their behavior easier and more efficient using OOP
+# Pipes are recycled once they leave the screen (see PipeQueue), so a long flight keeps reusing the same few pipe objects
 class Pipe(Game):
+    __slots__ = ("x", "prev_x", "height", "top_pipe", "bottom_pipe", "bird_passed")
     GAP = 200 # The gap in between the top and bottom pipe that the bird flies through
     VELOCITY = 5 # The pipes are what move backwards, not the bird moving forward - the bird doesn't actually have any horizontal velocity
+    PIPE_TOP = LazyAsset(lambda: assets.image("pipe.png", flip=True)) # The pipe at the top of the screen, which is flipped, shared by every pipe
+    PIPE_BOTTOM = LazyAsset(lambda: assets.image("pipe.png")) # The pipe on the bottom of the screen, shared by every pipe
+    # The masks of the top and bottom pipe never change, so they are built once rather than on every collision check
+    TOP_MASK = LazyAsset(lambda: assets.mask("pipe.png", flip=True)) # The mask of the top pipe, shared by every pipe
+    BOTTOM_MASK = LazyAsset(lambda: assets.mask("pipe.png")) # The mask of the bottom pipe, shared by every pipe
+
+    # The constructor for the Bird class, with 2 explicit parameters width and height and the object passed as an implicit paramater
+    # The height places the gap and comes from the pipe course being flown (see Course)
+    def __init__(self, width, height):
+        self.reset(width, height)
 
-    # The constructor for the Bird class, with 1 explicit parameter width and the object passed as an implicit paramater
-    def __init__(self, width):
+    # Puts the pipe back at the edge of the window with a new height, as if it had just been created
+    def reset(self, width, height):
         self.x = width # The x location of the pipe, which is at the edge of the window
+        self.prev_x = width # The x location of the pipe before its last move, used to draw it in between simulation steps
         self.height = 0 # The height of the pipe
         self.top_pipe = 0 # Location of the top of the pipe
         self.bottom_pipe = 0 # Location of the bottom of the pipe
-        self.PIPE_TOP = pygame.transform.flip(PIPE_ASSET, False, True) # The pipe at the top of the screen, which is flipped
-        self.PIPE_BOTTOM = PIPE_ASSET # The pipe on the bottom of the screen 
         self.bird_passed = False # Keeps track if the bird has already passed the pipe
-        self.set_height() # Sets the height of the pipe and the location of it
+        self.set_height(height) # Sets the height of the pipe and the location of it
     
     # Sets the height of the top and the bottom pipe with respect to the location of the ground
-    def set_height(self):
-        self.height = random.randrange(50, 450) # The height of the pipe, which is a random number between 40 and 450
+    def set_height(self, height):
+        self.height = height # The height of the pipe, which is a number between 50 and 450 taken from the course
         self.top_pipe = self.height - self.PIPE_TOP.get_height() # If the pipe is on the top, this determines where the top of the pipe is
         self.bottom_pipe = self.height + self.GAP # If the pipe is on the bottom, this determines where the bottom of the pipe is
 
     # Moves the pipe to the left, making it appear the bird is moving forward (relativity!)
     def move(self):
+        self.prev_x = self.x
         self.x -= self.VELOCITY # Move the pipe to the left based on the velocity
     
-    # Draw the top and bottom pipes in the game window
-    def draw(self, window):
-        window.blit(self.PIPE_TOP, (self.x, self.top_pipe)) # Draws the top pipe
-        window.blit(self.PIPE_BOTTOM, (self.x, self.bottom_pipe)) # Draws the bottom pipe
+    # Draw the top and bottom pipes in the game window, in between their previous and current position
+    # Returns the rectangle of the window that was drawn to (the column covering both pipes)
+    def draw(self, window, alpha=1):
+        x = self.prev_x + (self.x - self.prev_x) * alpha # Interpolate between the last two simulation steps
+        top = window.blit(self.PIPE_TOP, (x, self.top_pipe)) # Draws the top pipe
+        bottom = window.blit(self.PIPE_BOTTOM, (x, self.bottom_pipe)) # Draws the bottom pipe
+        return top.union(bottom)
     
     # Detect if the bird has collided with the pipe by checking the location of the bird mask relative to each pipe mask for pixel-perfect collisions
     def collide(self, bird):
-        bird_mask = bird.get_mask() # Gets the mask for the bird
-        top_pipe_mask = pygame.mask.from_surface(self.PIPE_TOP) # Gets the mask for the top pipe
-        bottom_pipe_mask = pygame.mask.from_surface(self.PIPE_BOTTOM) # Gets the mask for the bottom pipe
-
-        # Offsets compute how far away the bird mask is from a pipe mask
-        top_pipe_offset = (self.x - bird.x, self.top_pipe - round(bird.y)) # Stores the offset between the bird and the top pipe
-        bottom_pipe_offset = (self.x - bird.x, self.bottom_pipe - round(bird.y)) # Stores the offset between the bird and the bottom pipe
+        return self.collide_mask(bird.get_mask(), bird.x, bird.y)
 
-        top_collision_point = bird_mask.overlap(top_pipe_mask, top_pipe_offset) # Will be None if there is no overlap between the bird mask and the top pipe
-        bottom_collision_point = bird_mask.overlap(bottom_pipe_mask, bottom_pipe_offset) # Will be None if there is no overlap between the bird mask and the bottom pipe
+    # The collision test itself, for a bird with the given mask whose image is drawn at (bird_x, bird_y)
+    # The bounding boxes are compared first, and the (much slower) pixel test only runs for a pipe whose box actually overlaps the bird's
+    def collide_mask(self, bird_mask, bird_x, bird_y):
+        bird_y = round(bird_y) # The bird is drawn on whole pixels
+        bird_width, bird_height = bird_mask.get_size()
+        pipe_width, pipe_height = self.TOP_MASK.get_size()
 
-        # If bottom_collision_point and top_collision_point are not none, a collision occurred and return True; else return False
-        if bottom_collision_point != None or top_collision_point != None:
-            return True
-        else:
+        # If the bird is entirely to the left or right of the pipe, it cannot touch either half
+        if bird_x + bird_width <= self.x or self.x + pipe_width <= bird_x:
             return False
+
+        # Offsets compute how far away the bird mask is from a pipe mask
+        # Each half is only tested pixel by pixel if the bird's box overlaps it vertically; otherwise there cannot be an overlap
+        if bird_y < self.top_pipe + pipe_height and self.top_pipe < bird_y + bird_height:
+            if bird_mask.overlap(self.TOP_MASK, (self.x - bird_x, self.top_pipe - bird_y)) != None:
+                return True
+        if bird_y < self.bottom_pipe + pipe_height and self.bottom_pipe < bird_y + bird_height:
+            if bird_mask.overlap(self.BOTTOM_MASK, (self.x - bird_x, self.bottom_pipe - bird_y)) != None:
+                return True
+        return False
@@ -0,0 +1,88 @@
+# Import required libraries
+from pipe import Pipe
+
+# A PipeQueue class that holds the pipes on screen, ordered by x from left to right.
+# Every pipe moves at the same speed, new pipes only ever appear on the right and old ones only leave on the left, so the order never changes.
+# That lets the queue keep cursors instead of searching: one to the pipe the birds are flying towards, and one to the first pipe not yet passed.
+# Only the pipes whose x-range overlaps the birds' column need to be tested for collisions, which is at most one or two however many pipes are on screen.
+# Pipes that leave the screen are kept in a pool and reused for the next pipes spawned, the same way Base recycles its two strips of ground,
+# so a flight allocates no new pipes once its first few have been created.
+class PipeQueue:
+
+    # The constructor for the PipeQueue class, with the x-coordinate of the birds as an explicit parameter
+    def __init__(self, bird_x):
+        self.bird_x = bird_x # The x-coordinate of every bird (birds never move horizontally)
+        self.width = Pipe.PIPE_TOP.get_width() # The width of every pipe
+        self.pipes = [] # The pipes, ordered by x
+        self.next_index = 0 # The index of the pipe the birds are flying towards
+        self.passed_index = 0 # The index of the first pipe the birds have not passed yet
+        self.pool = [] # The pipes that have left the screen, ready to be reused
+        self.overlaps = [] # The pipes returned by overlapping, reused every step
+
+    def __len__(self):
+        return len(self.pipes)
+
+    def __iter__(self):
+        return iter(self.pipes)
+
+    def __getitem__(self, index):
+        return self.pipes[index]
+
+    # Adds a new pipe at x (on the right of every other pipe) with the given height, reusing a pipe from the pool if there is one
+    def spawn(self, x, height):
+        if self.pool:
+            pipe = self.pool.pop()
+            pipe.reset(x, height)
+        else:
+            pipe = Pipe(x, height)
+        self.pipes.append(pipe)
+        return pipe
+
+    # Returns the pipe the birds are flying towards: the first pipe whose right edge is not yet behind the birds (or the last pipe)
+    def next_pipe(self):
+        while self.next_index + 1 < len(self.pipes) and self.bird_x > self.pipes[self.next_index].x + self.width:
+            self.next_index += 1
+        return self.pipes[self.next_index]
+
+    # Returns the pipe after the one the birds are flying towards, or the next pipe itself while the one after it has not appeared yet
+    # Only valid straight after next_pipe, which moves the cursor along
+    def pipe_after_next(self):
+        return self.pipes[min(self.next_index + 1, len(self.pipes) - 1)]
+
+    # Returns the pipes whose x-range overlaps [x_min, x_max), i.e. the only ones something in that column can collide with
+    # The same list is reused by every call, so it is only valid until the next one
+    def overlapping(self, x_min, x_max):
+        overlaps = self.overlaps
+        overlaps.clear()
+        # The pipes before the next pipe are already completely behind the birds
+        for index in range(self.next_index, len(self.pipes)):
+            pipe = self.pipes[index]
+            if pipe.x >= x_max:
+                break # Every pipe after this one is further right still
+            if pipe.x + self.width > x_min:
+                overlaps.append(pipe)
+        return overlaps
+
+    # Marks the first pipe not yet passed as passed if the birds are now past it, returning whether a pipe was passed
+    def pass_pipe(self):
+        if self.passed_index < len(self.pipes) and self.pipes[self.passed_index].x < self.bird_x:
+            self.pipes[self.passed_index].bird_passed = True
+            self.passed_index += 1
+            return True
+        return False
+
+    # Removes the pipes that are completely off the left of the screen, keeping them in the pool to be reused
+    def cull(self):
+        removed = 0
+        while removed < len(self.pipes) and self.pipes[removed].x + self.width < 0:
+            removed += 1
+        if removed:
+            self.pool.extend(self.pipes[:removed])
+            del self.pipes[:removed]
+            self.next_index = max(self.next_index - removed, 0)
+            self.passed_index = max(self.passed_index - removed, 0)
+
+    # Moves every pipe leftward
+    def move(self):
+        for pipe in self.pipes:
+            pipe.move()
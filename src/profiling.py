@@ -0,0 +1,140 @@
+# Import required libraries
+import csv
+import os
+import time
+from collections import deque
+
+import numpy as np
+import neat
+
+PHASES = ("events", "move", "activate", "collide", "cull", "draw", "display") # The phases of a frame, in the order they happen
+PERCENTILES = (50, 90, 99) # The percentiles of the per-frame phase times reported every generation
+
+# A phase that does nothing, handed out by a disabled Profiler so instrumented code costs (almost) nothing when profiling is off
+class NullPhase:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_PHASE = NullPhase()
+
+# A phase being timed: entering and leaving it adds the time in between to the phase's total for the current frame
+class Phase:
+
+    # The constructor for the Phase class, with the profiler and the name of the phase as explicit parameters
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.frame_times[self.name] += time.perf_counter() - self.start
+        return False
+
+# A Profiler class that records how long every phase of the game loop takes.
+# The loops wrap each phase in "with profiler.phase(name):" and call end_frame() once per frame and end_generation() once per generation (or game).
+# A phase may be entered several times in a frame (e.g. once per simulation step), in which case its times are added up.
+# Every generation, the total time of each phase and its percentiles over the last window frames are handed to the sinks.
+class Profiler:
+
+    # The constructor for the Profiler class, with the sinks the reports are sent to and the number of frames the percentiles are taken over
+    def __init__(self, sinks=(), window=1000, enabled=True):
+        self.enabled = enabled # When False, every method returns straight away
+        self.sinks = list(sinks) # The objects whose report(record) method receives each generation's record
+        self.phases = {name: Phase(self, name) for name in PHASES} # One reusable timer per phase, so nothing is allocated per frame
+        self.frame_times = dict.fromkeys(PHASES, 0.0) # The time spent in each phase during the current frame
+        self.generation_times = dict.fromkeys(PHASES, 0.0) # The time spent in each phase during the current generation
+        self.history = {name: deque(maxlen=window) for name in PHASES} # The time spent in each phase during the last window frames
+        self.frames = 0 # The number of frames in the current generation
+        self.start = time.perf_counter() # When the current generation started
+
+    # Returns the timer of the named phase, for use in a with statement
+    def phase(self, name):
+        if not self.enabled:
+            return NULL_PHASE
+        return self.phases[name]
+
+    # Ends the current frame, adding its phase times to the generation's totals and the rolling window
+    def end_frame(self):
+        if not self.enabled:
+            return
+        for name, seconds in self.frame_times.items():
+            self.generation_times[name] += seconds
+            self.history[name].append(seconds)
+            self.frame_times[name] = 0.0
+        self.frames += 1
+
+    # Ends the current generation and sends its record to every sink
+    def end_generation(self, generation):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        record = {
+            "generation": generation,
+            "frames": self.frames,
+            "wall": now - self.start, # Includes everything that is not one of the phases (e.g. fitness bookkeeping)
+            "totals": dict(self.generation_times),
+            "percentiles": {name: dict(zip(PERCENTILES, np.percentile(self.history[name], PERCENTILES).tolist())) if self.history[name] else {}
+                            for name in PHASES},
+        }
+        for sink in self.sinks:
+            sink.report(record)
+
+        self.generation_times = dict.fromkeys(PHASES, 0.0)
+        self.frames = 0
+        self.start = now
+
+NULL_PROFILER = Profiler(enabled=False) # The profiler used when none is given
+
+# A sink that prints a table of each generation's phase times
+class StdOutSink:
+
+    def report(self, record):
+        print("Profile of generation {0}: {1} frames in {2:.3f} s".format(record["generation"], record["frames"], record["wall"]))
+        print("  {0:<10}{1:>12}{2:>12}{3:>12}{4:>12}".format("phase", "total ms", *("p{0} us".format(p) for p in PERCENTILES)))
+        for name in PHASES:
+            percentiles = [record["percentiles"][name].get(p, 0.0) * 1e6 for p in PERCENTILES]
+            print("  {0:<10}{1:>12.2f}{2:>12.1f}{3:>12.1f}{4:>12.1f}".format(name, record["totals"][name] * 1e3, *percentiles))
+
+# A sink that appends one row per phase of each generation to a CSV file
+class CSVSink:
+
+    # The constructor for the CSVSink class, with the path of the CSV file as an explicit parameter
+    def __init__(self, path):
+        self.path = path
+        # A new file starts with a header row
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "w", newline="") as f:
+                csv.writer(f).writerow(["generation", "frames", "wall", "phase", "total"] + ["p{0}".format(p) for p in PERCENTILES])
+
+    def report(self, record):
+        with open(self.path, "a", newline="") as f:
+            writer = csv.writer(f)
+            for name in PHASES:
+                writer.writerow([record["generation"], record["frames"], record["wall"], name, record["totals"][name]]
+                                + [record["percentiles"][name].get(p, "") for p in PERCENTILES])
+
+# A sink that is also a NEAT reporter: it keeps the records of the latest generations (so a long run does not keep them all)
+# and prints a one-line summary of where the time went after NEAT's own report of the generation
+class ProfilingReporter(neat.reporting.BaseReporter):
+    MAX_RECORDS = 100 # The number of generations whose records are kept
+
+    def __init__(self):
+        self.records = deque(maxlen=self.MAX_RECORDS) # The latest records received, oldest first
+
+    def report(self, record):
+        self.records.append(record)
+
+    def post_evaluate(self, config, population, species, best_genome):
+        if not self.records:
+            return
+        record = self.records[-1]
+        busiest = sorted(PHASES, key=lambda name: record["totals"][name], reverse=True)
+        print("Frame time: " + ", ".join("{0} {1:.1f} ms".format(name, record["totals"][name] * 1e3) for name in busiest if record["totals"][name] > 0))
@@ -0,0 +1,70 @@
+# Import required libraries
+import pygame
+
+import assets
+
+# A Renderer class that draws the game window one frame at a time, only redrawing what changed.
+# Instead of drawing the whole background every frame and pushing the whole window to the screen, it remembers where every sprite was drawn,
+# restores the background under just those rectangles, draws the sprites again and updates only the rectangles touched (the old and new positions).
+# Text (e.g. the score) is only drawn again when it changes or something drawn over it in the last frame has moved away.
+# The first frame, and every frame when dirty is False, is drawn in full exactly like before.
+class Renderer:
+
+    # The constructor for the Renderer class, with the window to draw to as an explicit parameter
+    def __init__(self, window, dirty=True):
+        self.window = window
+        self.dirty = dirty # Whether only the changed regions are redrawn (False redraws the whole window every frame)
+        self.background = assets.background() # The background every region is restored from
+        self.full = True # Whether the frame being drawn is drawn in full
+        self.restored = [] # The rectangles drawn in the last frame, whose background has been restored for this frame
+        self.drawn = [] # The rectangles drawn so far in this frame
+        self.updated = [] # Any other rectangles to update this frame (e.g. where text used to be)
+        self.texts = {} # The text drawn in each place, keyed by name: what it said and the rectangle it covers
+
+    # Starts a new frame by putting the background back under everything drawn in the last frame (or everywhere, for a full frame)
+    def begin_frame(self):
+        self.full = self.full or not self.dirty
+        if self.full:
+            self.window.blit(self.background, (0, 0))
+            return
+        for rect in self.restored:
+            self.window.blit(self.background, rect, rect)
+
+    # Draws text in a place kept under the given name, positioned by a keyword argument of pygame.Rect (e.g. topright=(x, y))
+    # Text is drawn before the sprites (so they are drawn over it), but only when it has changed or a sprite drawn over it has moved
+    def text(self, name, string, size, **position):
+        surface = assets.text(string, size)
+        rect = surface.get_rect(**position)
+        previous = self.texts.get(name)
+        if not self.full and previous is not None:
+            (previous_string, previous_size), previous_rect = previous
+            if previous_string == string and previous_size == size and previous_rect.collidelist(self.restored) == -1:
+                return
+            # Whatever was written before is cleared first, since the new text may be narrower
+            self.window.blit(self.background, previous_rect, previous_rect)
+            self.updated.append(previous_rect)
+        self.window.blit(surface, rect)
+        self.updated.append(rect)
+        self.texts[name] = ((string, size), rect)
+
+    # Draws a sprite (anything whose draw(window, alpha) returns the rectangle it drew to)
+    def draw(self, sprite, alpha=1):
+        self.drawn.append(sprite.draw(self.window, alpha))
+
+    # Draws many sprites that sit close together (e.g. the birds, which all share the same x-coordinate) and treats them as a single region,
+    # so a large population restores and updates one rectangle instead of one per bird
+    def draw_all(self, sprites, alpha=1):
+        rects = [sprite.draw(self.window, alpha) for sprite in sprites]
+        if rects:
+            self.drawn.append(rects[0].unionall(rects[1:]))
+
+    # Pushes the frame to the screen: only the rectangles that changed, or the whole window for a full frame
+    def end_frame(self):
+        if self.full:
+            pygame.display.update()
+        else:
+            pygame.display.update(self.restored + self.drawn + self.updated)
+        self.restored, self.drawn = self.drawn, self.restored
+        self.drawn.clear()
+        self.updated.clear()
+        self.full = False
@@ -0,0 +1,150 @@
+"""
+Flies every saved bird in a folder over the same seeded courses, headless and in parallel, and ranks them in a leaderboard.
+Each course is flown by all of the birds at once in a single World (just like a generation in gen_training), and the courses are
+spread over worker processes. A bird is ranked by the pipes it passed, then by how long it survived.
+
+    python replay.py models/ --courses 10 --workers 4 --output leaderboard.csv
+"""
+
+# Import required libraries
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Nothing is drawn, so SDL does not need a real display
+import argparse
+import csv
+import json
+import time
+from functools import partial
+from multiprocessing import Pool
+
+from course import Course, DEFAULT_SEED
+from model import load_bird
+from world import World, MAX_SCORE
+from sensors import Sensors
+
+MODEL_EXTENSIONS = (".fbm",) # The files that hold a saved bird
+PICKLE_EXTENSIONS = (".pickle",) # The files that hold a bird pickled by an older version of the game, only flown if allowed
+
+# Returns the path of every saved bird in the folder, in name order, including the pickled birds if allow_pickle is True
+def find_models(folder, allow_pickle=False):
+    extensions = MODEL_EXTENSIONS + PICKLE_EXTENSIONS if allow_pickle else MODEL_EXTENSIONS
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(extensions))
+
+# Flies every bird over the course generated from seed, all at once, until they have all died or passed more than max_score pipes
+# (or, if given, max_steps steps have gone by). Every bird reads the world through the given sensors (the default sensors if none are given).
+# Pickled birds are only loaded if allow_pickle is True (see load_bird).
+# Returns one dictionary per bird with the frames it survived, the pipes it passed, the decisions its network made and the time they took.
+def replay_course(paths, seed, max_score=MAX_SCORE, max_steps=None, sensors=None, allow_pickle=False):
+    sensors = Sensors() if sensors is None else sensors
+    neural_networks = [load_bird(path, allow_pickle) for path in paths]
+    for path, neural_network in zip(paths, neural_networks):
+        sensors.check(neural_network, path)
+    world = World(len(paths), seed) # The simulation, with one bird per saved network
+    frames = [0] * len(paths) # The steps each bird has survived
+    pipes = [0] * len(paths) # The pipes each bird has passed
+    decisions = [0] * len(paths) # The number of times each network decided whether to jump
+    think_time = [0.0] * len(paths) # The time each network spent deciding, in seconds
+
+    # Each living bird's network decides whether it should jump
+    inputs = [0.0] * sensors.size # The inputs of a network, refilled for every bird
+    def think(next_pipe):
+        for i in world.alive:
+            bird = world.birds[i]
+            sensors.read_into(inputs, bird, next_pipe, world.pipes)
+            start = time.perf_counter()
+            nn_output = neural_networks[i].activate(inputs)
+            think_time[i] += time.perf_counter() - start
+            decisions[i] += 1
+            if nn_output[0] > 0.5:
+                bird.jump()
+
+    while world.alive:
+        for i in world.alive:
+            frames[i] += 1
+        _, passed, fell = world.step(think)
+
+        # As in gen_training, a pipe counts for the birds still flying and the ones that hit the ground right after it, but not for the ones that hit it
+        if passed:
+            for i in world.alive + fell:
+                pipes[i] += 1
+
+        if world.score > max_score or (max_steps is not None and world.steps >= max_steps):
+            break
+
+    return [{"frames": frames[i], "pipes": pipes[i], "decisions": decisions[i], "think_time": think_time[i]} for i in range(len(paths))]
+
+# Flies every saved bird over every course (spreading the courses over workers processes, if any) and returns the leaderboard,
+# with one entry per bird from best to worst
+def replay(paths, seeds, workers=0, max_score=MAX_SCORE, max_steps=None, sensors=None, allow_pickle=False):
+    fly_course = partial(replay_course, paths, max_score=max_score, max_steps=max_steps, sensors=sensors, allow_pickle=allow_pickle)
+    if workers > 0:
+        with Pool(workers) as pool:
+            courses = pool.map(fly_course, seeds)
+    else:
+        courses = [fly_course(seed) for seed in seeds]
+
+    leaderboard = []
+    for i, path in enumerate(paths):
+        flights = [course[i] for course in courses]
+        decisions = sum(flight["decisions"] for flight in flights)
+        think_time = sum(flight["think_time"] for flight in flights)
+        leaderboard.append({
+            "model": os.path.basename(path),
+            "mean_pipes": sum(flight["pipes"] for flight in flights) / len(flights),
+            "min_pipes": min(flight["pipes"] for flight in flights),
+            "mean_frames": sum(flight["frames"] for flight in flights) / len(flights),
+            "min_frames": min(flight["frames"] for flight in flights),
+            "decisions": decisions,
+            "decisions_per_sec": decisions / think_time if think_time > 0 else None,
+            "pipes": [flight["pipes"] for flight in flights],
+        })
+
+    leaderboard.sort(key=lambda entry: (entry["mean_pipes"], entry["mean_frames"]), reverse=True)
+    for rank, entry in enumerate(leaderboard, 1):
+        entry["rank"] = rank
+    return leaderboard
+
+# Prints the leaderboard as a table
+def print_leaderboard(leaderboard):
+    print("{0:>4}  {1:<30}{2:>12}{3:>10}{4:>13}{5:>15}".format("rank", "model", "mean pipes", "min pipes", "mean frames", "decisions/s"))
+    for entry in leaderboard:
+        decisions_per_sec = "{0:,.0f}".format(entry["decisions_per_sec"]) if entry["decisions_per_sec"] is not None else "-"
+        print("{0:>4}  {1:<30}{2:>12.1f}{3:>10}{4:>13.1f}{5:>15}".format(entry["rank"], entry["model"], entry["mean_pipes"], entry["min_pipes"],
+                                                                      entry["mean_frames"], decisions_per_sec))
+
+# Writes the leaderboard to a JSON file, or to a CSV file (one row per bird) if the path ends in .csv
+def save_leaderboard(leaderboard, seeds, path):
+    if path.endswith(".csv"):
+        columns = ["rank", "model", "mean_pipes", "min_pipes", "mean_frames", "min_frames", "decisions", "decisions_per_sec"]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns + ["pipes_seed_{0}".format(seed) for seed in seeds])
+            for entry in leaderboard:
+                writer.writerow([entry[column] for column in columns] + entry["pipes"])
+    else:
+        with open(path, "w") as f:
+            json.dump({"seeds": seeds, "leaderboard": leaderboard}, f, indent=2)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fly a folder of saved birds over the same seeded courses and rank them")
+    parser.add_argument("models", help="the folder of saved birds (.fbm model files)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="the seed the courses are derived from")
+    parser.add_argument("--courses", type=int, default=5, metavar="K", help="the number of courses every bird flies")
+    parser.add_argument("--workers", type=int, default=0, metavar="N", help="fly the courses in N processes")
+    parser.add_argument("--max-steps", type=int, default=None, metavar="N", help="end every course after N steps")
+    parser.add_argument("--config", default=None, metavar="PATH", help="the NEAT config file the birds were trained with, for its sensors")
+    parser.add_argument("--output", default=None, metavar="PATH", help="also write the leaderboard to a JSON (or .csv) file")
+    parser.add_argument("--allow-pickle", action="store_true", help="also fly the .pickle networks of older versions (unpickling runs code: trusted files only)")
+    args = parser.parse_args()
+
+    paths = find_models(args.models, args.allow_pickle)
+    if not paths:
+        parser.error("no saved birds found in {0}".format(args.models))
+    seeds = Course.seeds(args.seed, args.courses)
+
+    start = time.perf_counter()
+    sensors = Sensors() if args.config is None else Sensors.from_file(args.config)
+    leaderboard = replay(paths, seeds, args.workers, max_steps=args.max_steps, sensors=sensors, allow_pickle=args.allow_pickle)
+    print("Flew {0} birds over {1} courses in {2:.2f} s".format(len(paths), len(seeds), time.perf_counter() - start))
+    print_leaderboard(leaderboard)
+    if args.output is not None:
+        save_leaderboard(leaderboard, seeds, args.output)
@@ -0,0 +1,118 @@
+# Import required libraries
+import configparser
+import numpy as np
+
+from bird import Bird
+from pipe import Pipe
+from world import WIN_WIDTH, WIN_LENGTH, BIRD_X
+
+# Every sensor a bird can have, keyed by name: how it is read and the value it is divided by when the sensors are normalised.
+# Each one is read from the birds' y-coordinates and vertical speeds (one number each, or an array for a whole flock at once),
+# the pipe they are flying towards and the pipe after that (or the next pipe again, while the one after it has not appeared yet).
+SENSORS = {
+    "y": (lambda y, speed, pipe, after: y, WIN_LENGTH), # How far the bird is from the top of the screen
+    "top": (lambda y, speed, pipe, after: abs(y - pipe.height), WIN_LENGTH), # How far the bird is from the end of the next top pipe
+    "bottom": (lambda y, speed, pipe, after: abs(y - pipe.bottom_pipe), WIN_LENGTH), # How far the bird is from the end of the next bottom pipe
+    "velocity": (lambda y, speed, pipe, after: speed, Bird.TERMINAL_VELOCITY), # How fast the bird is falling (negative while rising)
+    "distance": (lambda y, speed, pipe, after: pipe.x - BIRD_X, WIN_WIDTH), # How far ahead of the bird the next pipe is
+    "next_gap": (lambda y, speed, pipe, after: y - (after.height + Pipe.GAP / 2), WIN_LENGTH), # How far below the middle of the gap after next the bird is
+}
+DEFAULT_SENSORS = ("y", "top", "bottom") # The sensors of every bird trained before sensors could be chosen, which the saved birds expect
+
+# A Sensors class that turns what the birds can see into the inputs of their neural networks, for one bird or a whole population at once.
+# Training (in any process, with or without the flock) and the LEARN mode all read the birds through the same Sensors, so a bird
+# always sees the world the way it was trained to. The sensors are chosen in the [Sensors] section of the NEAT config file:
+#
+#     [Sensors]
+#     sensors   = y top bottom velocity distance next_gap
+#     normalise = True
+#
+# Normalised sensors are divided by the size of the screen (or the terminal velocity), so every input stays roughly within [-1, 1].
+# They are off unless asked for: with the tanh output and weights of the default config, birds reading the raw distances (in pixels)
+# learn to fly in fewer generations, since even a small weight turns them into a clear decision to jump or not.
+class Sensors:
+
+    # The constructor for the Sensors class, with the names of the sensors (in the order the networks take them) and whether to normalise them
+    def __init__(self, names=DEFAULT_SENSORS, normalise=False):
+        unknown = [name for name in names if name not in SENSORS]
+        if unknown:
+            raise ValueError("Unknown sensors {0} (the sensors are {1})".format(", ".join(unknown), ", ".join(SENSORS)))
+        self.names = tuple(names)
+        self.normalise = normalise
+        self.size = len(self.names) # The number of inputs of every network
+        self.functions = [SENSORS[name][0] for name in self.names] # Reads each sensor
+        self.scales = [1 / SENSORS[name][1] if normalise else 1.0 for name in self.names] # What each sensor is multiplied by
+        self.scale_array = np.array(self.scales) # The same, for a whole population at once
+        self.classic = self.names == DEFAULT_SENSORS and not normalise # The original raw inputs, which are read directly (see read_into)
+
+    # Sensors are sent to worker processes (and saved in checkpoints) with the config, so only their names are pickled, not the lambdas
+    def __reduce__(self):
+        return (Sensors, (self.names, self.normalise))
+
+    def __eq__(self, other):
+        return isinstance(other, Sensors) and (self.names, self.normalise) == (other.names, other.normalise)
+
+    def __hash__(self):
+        return hash((self.names, self.normalise))
+
+    def __repr__(self):
+        return "Sensors({0}, normalise={1})".format(" ".join(self.names), self.normalise)
+
+    # Returns the sensors chosen in the [Sensors] section of a NEAT config file, or the default sensors if it has none
+    @classmethod
+    def from_file(cls, config_file):
+        parser = configparser.ConfigParser()
+        parser.read(config_file)
+        if not parser.has_section("Sensors"):
+            return cls()
+        section = parser["Sensors"]
+        return cls(section.get("sensors", " ".join(DEFAULT_SENSORS)).split(), section.getboolean("normalise", False))
+
+    # Makes a NEAT config build networks with one input per sensor, and keeps the sensors with the config so every process reads the same ones
+    def configure(self, config):
+        config.genome_config.num_inputs = self.size
+        config.genome_config.input_keys = [-i - 1 for i in range(self.size)]
+        config.sensors = self
+        return config
+
+    # Raises a ValueError if a neural network (or model) does not take one input per sensor
+    def check(self, neural_network, name="The bird"):
+        num_inputs = getattr(neural_network, "num_inputs", None)
+        if num_inputs is None:
+            num_inputs = len(neural_network.input_nodes)
+        if num_inputs != self.size:
+            raise ValueError("{0} takes {1} inputs, but the sensors ({2}) give {3}".format(name, num_inputs, " ".join(self.names), self.size))
+
+    # Writes the inputs of a single bird into the list inputs (one entry per sensor) and returns it, ready for a network's activate().
+    # The bird is flying towards pipe, the next pipe of the PipeQueue pipes (so the pipe after it can be found, if a sensor needs it).
+    # The same list can be refilled for every bird of every step, so reading the birds allocates nothing; the default sensors
+    # are written straight into it, as cheaply as the inputs were built before sensors could be chosen.
+    def read_into(self, inputs, bird, pipe, pipes):
+        y = bird.y
+        if self.classic:
+            inputs[0] = y
+            inputs[1] = abs(y - pipe.height)
+            inputs[2] = abs(y - pipe.bottom_pipe)
+            return inputs
+        after = pipes.pipe_after_next()
+        speed = min(bird.velocity + Bird.GRAVITY * bird.tick_count, Bird.TERMINAL_VELOCITY)
+        for j, function in enumerate(self.functions):
+            inputs[j] = function(y, speed, pipe, after) * self.scales[j]
+        return inputs
+
+    # Returns the inputs of a whole population flying past the given PipeQueue, as one array with a row per bird.
+    # The birds are given by their y-coordinates, their velocities right after their last jumps and how long they have moved since (as in a Flock)
+    def read(self, y, velocity, tick_count, pipes):
+        pipe = pipes.next_pipe()
+        after = pipes.pipe_after_next()
+        speed = np.minimum(velocity + Bird.GRAVITY * tick_count, Bird.TERMINAL_VELOCITY)
+        inputs = np.empty((len(y), self.size))
+        for j, function in enumerate(self.functions):
+            inputs[:, j] = function(y, speed, pipe, after)
+        if self.normalise:
+            inputs *= self.scale_array
+        return inputs
+
+# Returns the sensors a NEAT config was set up with (see Sensors.configure), or the default sensors for a config (or checkpoint) without any
+def config_sensors(config):
+    return getattr(config, "sensors", None) or Sensors()
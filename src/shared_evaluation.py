@@ -0,0 +1,115 @@
+# Import required libraries
+from multiprocessing import Pool, resource_tracker, shared_memory
+import numpy as np
+import neat
+
+from course import DEFAULT_SEED
+from model import Model, model_bytes
+from sensors import config_sensors
+import evaluation
+
+# The layout of the shared memory block of a generation of count genomes:
+#   offsets  int64[count + 1]  where each genome's network starts in the networks (and where the last one ends)
+#   fitness  float64[count]    the fitness of each genome, written by the workers
+#   networks bytes             every genome's network in the model file format (see model.py), each padded to 8 bytes so its arrays stay aligned
+ALIGNMENT = 8
+
+# Returns NumPy views of the offsets and fitness of a block holding count genomes, and a memoryview of its networks
+def _views(buffer, count):
+    offsets = np.ndarray((count + 1,), dtype=np.int64, buffer=buffer)
+    fitness = np.ndarray((count,), dtype=np.float64, buffer=buffer, offset=offsets.nbytes)
+    return offsets, fitness, buffer[offsets.nbytes + fitness.nbytes:]
+
+WORKER_BLOCKS = {} # The shared memory blocks a worker process has attached to, keyed by name (only the latest one is kept)
+
+# Returns the shared memory block with the given name, attaching to it the first time a worker sees it
+def _attach(name):
+    block = WORKER_BLOCKS.get(name)
+    if block is None:
+        # The evaluator only replaces its block when it grows, so any older block is no longer needed
+        for old in WORKER_BLOCKS.values():
+            old.close()
+        WORKER_BLOCKS.clear()
+        block = WORKER_BLOCKS[name] = shared_memory.SharedMemory(name=name)
+    return block
+
+# Runs in a worker process: flies the genomes start to end of the generation in the named block, writing their fitness straight into the block.
+# The task itself only holds a few numbers (and the names of the sensors), so nothing but these is ever sent to a worker.
+def _evaluate_slice(task):
+    name, count, start, end, seed, seeds, aggregate, max_steps, sensors = task
+    offsets, fitness, networks = _views(_attach(name).buf, count)
+    for i in range(start, end):
+        neural_network = Model(None, data=networks[offsets[i]:offsets[i + 1]]) # Read in place, with no copy of the network's arrays
+        if seeds is None:
+            fitness[i] = evaluation.fly(neural_network, seed, sensors=sensors)[0]
+        else:
+            fitness[i] = evaluation.fly_courses(neural_network, seeds, aggregate, max_steps=max_steps, sensors=sensors)[0]
+        del neural_network # The model's arrays are views of the block too
+    del offsets, fitness, networks # The views must be gone before the block can be closed
+
+# A SharedMemoryEvaluator class that is a NEAT fitness function spreading the genomes over worker processes, like neat.ParallelEvaluator,
+# but without pickling a genome and the whole config for every genome of every generation.
+# Each generation, the main process compiles every genome into a network and publishes all of them at once in a shared memory block.
+# Each worker is then only told which slice of genomes to fly; it reads their networks straight from the block (no copies) and writes
+# their fitness back into it. The courses are generated from their seeds inside every worker, so they never need sending either.
+# Genomes are flown exactly as by evaluation.fly (or fly_courses, for several courses), so the fitness is the same as flying them in one process.
+class SharedMemoryEvaluator:
+
+    # The constructor for the SharedMemoryEvaluator class, with the number of worker processes as an explicit parameter
+    def __init__(self, num_workers, chunks_per_worker=4):
+        self.num_workers = num_workers
+        self.chunks_per_worker = chunks_per_worker # Each generation is split into this many slices per worker, so the workers finish together
+        # The workers must share this process's resource tracker; one of their own would unlink the shared memory as soon as they exit
+        resource_tracker.ensure_running()
+        self.pool = Pool(num_workers)
+        self.block = None # The shared memory block, replaced by a larger one whenever a generation does not fit
+
+    # Returns a shared memory block of at least size bytes, keeping the current one if it is large enough
+    def _block(self, size):
+        if self.block is None or self.block.size < size:
+            if self.block is not None:
+                self.block.close()
+                self.block.unlink()
+            self.block = shared_memory.SharedMemory(create=True, size=max(size, 2 * self.block.size if self.block is not None else 0))
+        return self.block
+
+    # Evaluates a generation of genomes, in the form expected by neat.Population.run
+    def evaluate(self, genomes, config):
+        count = len(genomes)
+        networks = []
+        for _, genome in genomes:
+            network = model_bytes(neat.nn.FeedForwardNetwork.create(genome, config))
+            networks.append(network + bytes(-len(network) % ALIGNMENT))
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum([len(network) for network in networks], out=offsets[1:])
+
+        # Publish every network at once
+        header_size = offsets.nbytes + count * 8
+        block = self._block(header_size + int(offsets[-1]))
+        shared_offsets, fitness, shared_networks = _views(block.buf, count)
+        shared_offsets[:] = offsets
+        shared_networks[:int(offsets[-1])] = b"".join(networks)
+
+        # The workers fly their slices of the generation, writing the fitness into the block
+        seed = getattr(config, "course_seed", DEFAULT_SEED)
+        seeds = getattr(config, "course_seeds", None)
+        aggregate = getattr(config, "fitness_aggregate", "mean")
+        max_steps = getattr(config, "max_course_steps", None)
+        sensors = config_sensors(config)
+        chunk = max(1, -(-count // (self.num_workers * self.chunks_per_worker)))
+        tasks = [(block.name, count, start, min(start + chunk, count), seed, seeds, aggregate, max_steps, sensors)
+                 for start in range(0, count, chunk)]
+        self.pool.map(_evaluate_slice, tasks)
+
+        for (_, genome), genome_fitness in zip(genomes, fitness.tolist()):
+            genome.fitness = genome_fitness
+        del shared_offsets, fitness, shared_networks # The views must be gone before the block can be closed
+
+    # Stops the workers and frees the shared memory
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
@@ -0,0 +1,118 @@
+# Import required libraries
+import csv
+import json
+import os
+import time
+import neat
+from neat.math_util import mean, median2, stdev
+
+# The columns of the CSV log, in order; the species sizes are written as "species:size" pairs separated by spaces
+CSV_COLUMNS = ["generation", "time", "population", "fitness_min", "fitness_mean", "fitness_median", "fitness_stdev", "fitness_max",
+               "species", "species_sizes", "best_key", "best_fitness", "best_nodes", "best_connections", "evaluation_seconds", "generation_seconds"]
+
+# A StreamingStatisticsReporter class that is a NEAT reporter appending a summary of every generation to a log file, instead of
+# keeping the whole history in memory the way neat.StatisticsReporter does: the fitness distribution, the size of every species,
+# how long the generation took and a summary of its best genome.
+# The log is JSON lines (one object per generation), or CSV if the path ends in .csv.
+# Summaries are written in batches of flush_every generations (and whenever the run ends or is interrupted, see close), so only
+# a handful are ever held in memory. Once the log grows past max_bytes, it is rotated like a logging.RotatingFileHandler:
+# the log becomes path.1, path.1 becomes path.2 and so on, keeping at most backups old logs.
+class StreamingStatisticsReporter(neat.reporting.BaseReporter):
+
+    # The constructor for the StreamingStatisticsReporter class, with the path of the log as an explicit parameter
+    def __init__(self, path, flush_every=10, max_bytes=10 * 1024 * 1024, backups=5):
+        self.path = path
+        self.csv = path.endswith(".csv") # Whether the log is CSV rather than JSON lines
+        self.flush_every = flush_every # The number of generations summarised before they are written
+        self.max_bytes = max_bytes # The size the log can reach before it is rotated (None never rotates)
+        self.backups = backups # The number of rotated logs kept
+        self.buffer = [] # The summaries not written yet
+        self.generation = None # The generation being evaluated
+        self.generation_start = None # When the generation being evaluated started
+        self.summary = None # The summary of the generation being evaluated, completed at the end of the generation
+
+    # Summaries waiting in the buffer are not copied into checkpoints (the species set keeps a reference to every reporter)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["buffer"] = []
+        return state
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.generation_start = time.perf_counter()
+
+    # Summarises the generation that was just evaluated
+    def post_evaluate(self, config, population, species, best_genome):
+        fitnesses = [genome.fitness for genome in population.values() if genome.fitness is not None]
+        nodes, connections = best_genome.size()
+        self.summary = {
+            "generation": self.generation,
+            "time": time.time(),
+            "population": len(population),
+            "fitness_min": min(fitnesses),
+            "fitness_mean": mean(fitnesses),
+            "fitness_median": median2(fitnesses),
+            "fitness_stdev": stdev(fitnesses),
+            "fitness_max": max(fitnesses),
+            "species": len(species.species),
+            "species_sizes": {sid: len(s.members) for sid, s in species.species.items()},
+            "best_key": best_genome.key,
+            "best_fitness": best_genome.fitness,
+            "best_nodes": nodes,
+            "best_connections": connections,
+            "evaluation_seconds": time.perf_counter() - self.generation_start,
+        }
+
+    # The generation is over (reproduction and speciation included), so its summary is complete
+    def end_generation(self, config, population, species_set):
+        if self.summary is None:
+            return
+        self.summary["generation_seconds"] = time.perf_counter() - self.generation_start
+        self.buffer.append(self.summary)
+        self.summary = None
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    # NEAT stops straight after the generation that found a solution, without ending it, so its summary is completed here
+    def found_solution(self, config, generation, best):
+        self.end_generation(config, None, None)
+        self.flush()
+
+    def complete_extinction(self):
+        self.flush()
+
+    # Writes every summary in the buffer to the log, rotating the log first if it has grown too large
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.max_bytes is not None and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self.rotate()
+
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", newline="") as f:
+            if self.csv:
+                writer = csv.writer(f)
+                # A new log starts with a header row
+                if new_file:
+                    writer.writerow(CSV_COLUMNS)
+                for summary in self.buffer:
+                    row = dict(summary, species_sizes=" ".join("{0}:{1}".format(sid, size) for sid, size in summary["species_sizes"].items()))
+                    writer.writerow([row[column] for column in CSV_COLUMNS])
+            else:
+                f.writelines(json.dumps(summary) + "\n" for summary in self.buffer)
+        self.buffer.clear()
+
+    # Shifts every log along by one (dropping the oldest), so the next summaries start a new log
+    def rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            older = "{0}.{1}".format(self.path, i)
+            if os.path.exists(older):
+                os.replace(older, "{0}.{1}".format(self.path, i + 1))
+        if self.backups > 0:
+            os.replace(self.path, self.path + ".1")
+        else:
+            os.remove(self.path)
+
+    # Writes whatever is left in the buffer; called when the run ends, however it ends
+    def close(self):
+        self.flush()
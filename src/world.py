@@ -0,0 +1,135 @@
+# Import required libraries
+import pygame
+
+from bird import Bird
+from pipe_queue import PipeQueue
+from base import Base
+from course import Course
+from profiling import NULL_PROFILER
+
+WIN_WIDTH = 575 # The width of the game window
+WIN_LENGTH = 800 # The length of the game window
+BIRD_X = 230 # The x-coordinate of every bird (birds never move horizontally)
+BIRD_Y = 350 # The y-coordinate every bird starts at
+MAX_SCORE = 150 # A bird that passes more pipes than this is considered invincible and its flight ends
+
+STEP = 1 / 30 # The length of one simulation step in seconds; the game was designed to run 30 steps every second
+MAX_RENDER_FPS = 60 # The most frames drawn every second when a window is shown
+MAX_STEPS_PER_FRAME = 5 # If drawing falls far behind, game time slows down rather than trying to catch up forever
+
+# A World class that is the simulation core shared by every game mode.
+# It holds one or more birds, the pipes of a seeded course and the base, and advances them by exactly one fixed step at a time.
+# It knows nothing about windows, clocks or events: the PLAY, LEARN and TRAIN modes decide how often it is stepped and when it is drawn.
+class World:
+
+    # The constructor for the World class, with the number of birds and the seed of the pipe course as explicit parameters
+    # The profiler, if given, times the move, activate, collide and cull phases of every step
+    def __init__(self, num_birds, seed, profiler=NULL_PROFILER):
+        self.birds = [Bird(BIRD_X, BIRD_Y) for _ in range(num_birds)] # Every bird, dead or alive
+        self.alive = list(range(num_birds)) # The indices of the birds still flying, in order
+        self.seed = seed # The seed of the pipe course
+        self.heights = iter(Course.get(seed)) # The heights of the pipes, in order
+        self.base = Base() # The base object
+        self.pipes = PipeQueue(BIRD_X) # Keeps track of the current pipes, ordered by x
+        self.pipes.spawn(WIN_WIDTH, next(self.heights))
+        self.bird_width = Bird.ASSETS[0].get_width() # Every image of the bird has the same width
+        self.score = 0 # The number of pipes passed
+        self.steps = 0 # The number of simulation steps taken so far
+        self.profiler = profiler # Times the phases of each step
+        self.crashed = [] # The birds that hit a pipe during the last step, reused every step
+        self.fell = [] # The birds that hit the ground or the top during the last step, reused every step
+
+    # Returns the pipe the birds are flying towards, i.e. the first pipe that is not yet completely behind them
+    def next_pipe(self):
+        return self.pipes.next_pipe()
+
+    # Returns the birds still flying
+    def living_birds(self):
+        return [self.birds[i] for i in self.alive]
+
+    # Advances the world by one simulation step.
+    # After the living birds have moved, think(next_pipe) is called so the player (or neural network) can make birds jump.
+    # Returns the indices of the birds that hit a pipe, whether a pipe was passed, and the indices of the birds that hit the ground or the top.
+    # The two lists of indices are reused by the next step, so they should be read (or copied) before stepping again.
+    def step(self, think=None):
+        profiler = self.profiler
+        next_pipe = self.next_pipe() # The pipe the birds see is decided before anything moves
+
+        # Move every living bird and advance its flapping animation
+        with profiler.phase("move"):
+            for i in self.alive:
+                self.birds[i].move()
+                self.birds[i].animate()
+
+        # Let the player or the neural networks decide which birds should jump
+        if think is not None:
+            with profiler.phase("activate"):
+                think(next_pipe)
+
+        crashed = self.crashed # The birds that hit a pipe during this step
+        crashed.clear()
+        # The pipe can only be passed while there are birds left to pass it.
+        # Pipes are spaced far wider than a bird, so no other pipe can kill the birds in the same step as the pipe being passed
+        any_alive = len(self.alive) > 0
+        with profiler.phase("collide"):
+            # Only the pipes level with the birds can be hit: any living bird that collides with one of them dies
+            for pipe in self.pipes.overlapping(BIRD_X, BIRD_X + self.bird_width):
+                hits = len(crashed)
+                for i in self.alive:
+                    if pipe.collide(self.birds[i]):
+                        crashed.append(i)
+                if len(crashed) > hits:
+                    dead = set(crashed)
+                    self.alive = [i for i in self.alive if i not in dead]
+
+            # If the birds have passed the next pipe and it has not been passed before, we need to draw a new pipe
+            add_pipe = any_alive and self.pipes.pass_pipe()
+
+        with profiler.phase("cull"):
+            self.pipes.cull() # Remove the pipes that are completely off the screen
+            self.pipes.move() # Move the pipes leftward
+
+            # If the birds have passed the set of pipes, increment the score and add a new pipe from the course
+            if add_pipe:
+                self.score += 1
+                self.pipes.spawn(WIN_WIDTH, next(self.heights))
+
+            # Any living bird that hits the ground or flies off the top of the screen dies
+            fell = self.fell
+            fell.clear()
+            for i in self.alive:
+                bird = self.birds[i]
+                if bird.y + bird.img.get_height() >= self.base.y or bird.y < 0:
+                    fell.append(i)
+            if fell:
+                dead = set(fell)
+                self.alive = [i for i in self.alive if i not in dead]
+
+        self.base.move() # Call the move method defined for a base object
+        self.steps += 1
+        return crashed, add_pipe, fell
+
+# A Timestep class that decides how many fixed simulation steps to take for each frame drawn.
+# Real time is accumulated every frame and spent in whole steps of STEP seconds, so game time runs at the same speed however
+# fast or slow drawing is. What is left over is the fraction of a step (alpha) to draw the sprites in between their last two positions.
+class Timestep:
+
+    # The constructor for the Timestep class
+    def __init__(self):
+        self.clock = pygame.time.Clock() # Measures the time taken by each frame
+        self.accumulator = 0.0 # The real time not yet simulated, in seconds
+
+    # Waits for the next frame and returns the number of simulation steps to take before drawing it
+    def steps(self):
+        self.accumulator += self.clock.tick(MAX_RENDER_FPS) / 1000
+        steps = int(self.accumulator / STEP)
+        # If the game fell too far behind, drop the backlog instead of freezing while it catches up
+        if steps > MAX_STEPS_PER_FRAME:
+            steps = MAX_STEPS_PER_FRAME
+            self.accumulator = steps * STEP
+        self.accumulator -= steps * STEP
+        return steps
+
+    # How far the game is between its previous and current simulation step (0 to 1)
+    def alpha(self):
+        return self.accumulator / STEP
@@ -0,0 +1,131 @@
+# Shared setup for the tests: the game's modules are imported from src/ the way the game imports them,
+# and nothing is ever drawn, so SDL is given its dummy video driver before pygame is imported
+import os
+import random
+import sys
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import neat
+
+import flappybird_game
+
+# A small NEAT config, like the one the game is trained with: 3 inputs (the default sensors), 1 tanh output and no hidden nodes to start with
+NEAT_CONFIG = """
+[NEAT]
+fitness_criterion     = max
+fitness_threshold     = 100000
+pop_size              = 50
+reset_on_extinction   = False
+no_fitness_termination = False
+
+[DefaultGenome]
+activation_default      = tanh
+activation_mutate_rate  = 0.0
+activation_options      = tanh
+aggregation_default     = sum
+aggregation_mutate_rate = 0.0
+aggregation_options     = sum
+bias_init_mean          = 0.0
+bias_init_type          = gaussian
+bias_init_stdev         = 1.0
+bias_max_value          = 30.0
+bias_min_value          = -30.0
+bias_mutate_power       = 0.5
+bias_mutate_rate        = 0.7
+bias_replace_rate       = 0.1
+compatibility_disjoint_coefficient = 1.0
+compatibility_weight_coefficient   = 0.5
+conn_add_prob           = 0.5
+conn_delete_prob        = 0.5
+enabled_default         = True
+enabled_mutate_rate     = 0.01
+enabled_rate_to_false_add = 0.0
+enabled_rate_to_true_add  = 0.0
+feed_forward            = True
+initial_connection      = full
+node_add_prob           = 0.2
+node_delete_prob        = 0.2
+num_hidden              = 0
+num_inputs              = 3
+num_outputs             = 1
+single_structural_mutation = false
+structural_mutation_surer  = default
+response_init_mean      = 1.0
+response_init_type      = gaussian
+response_init_stdev     = 0.0
+response_max_value      = 30.0
+response_min_value      = -30.0
+response_mutate_power   = 0.0
+response_mutate_rate    = 0.0
+response_replace_rate   = 0.0
+weight_init_mean        = 0.0
+weight_init_type        = gaussian
+weight_init_stdev       = 1.0
+weight_max_value        = 30
+weight_min_value        = -30
+weight_mutate_power     = 0.5
+weight_mutate_rate      = 0.8
+weight_replace_rate     = 0.1
+
+[DefaultSpeciesSet]
+compatibility_threshold = 3.0
+
+[DefaultStagnation]
+species_fitness_func = max
+max_stagnation       = 20
+species_elitism      = 2
+
+[DefaultReproduction]
+elitism            = 2
+min_species_size   = 2
+survival_threshold = 0.2
+"""
+
+# The path of a NEAT config file written from NEAT_CONFIG
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "neatconfig.txt"
+    path.write_text(NEAT_CONFIG)
+    return str(path)
+
+# A NEAT config loaded from config_file
+@pytest.fixture
+def config(config_file):
+    return neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
+
+# Returns count brand new genomes (as (key, genome) pairs, like NEAT hands them to a fitness function), mutated the given number of times.
+# The genomes only depend on the seed, so every test run flies the same birds
+def new_genomes(config, count, seed, mutations=0):
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        genomes = []
+        for key in range(count):
+            genome = neat.DefaultGenome(key)
+            genome.configure_new(config.genome_config)
+            for _ in range(mutations):
+                genome.mutate(config.genome_config)
+            genomes.append((key, genome))
+        return genomes
+    finally:
+        random.setstate(state)
+
+# new_genomes for the config of the test
+@pytest.fixture
+def genomes(config):
+    return lambda count, seed, mutations=0: new_genomes(config, count, seed, mutations)
+
+# Makes gen_training train headless (as --headless does), saving any invincible bird under tmp_path instead of over the shipped bird
+@pytest.fixture
+def training(monkeypatch, tmp_path):
+    monkeypatch.setattr(flappybird_game, "HEADLESS_TRAINING", True)
+    monkeypatch.setattr(flappybird_game, "RENDER_EVERY_N_GEN", 0)
+    monkeypatch.setattr(flappybird_game, "VECTORISED_TRAINING", False)
+    monkeypatch.setattr(flappybird_game, "TRACE_PATH", None)
+    monkeypatch.setattr(flappybird_game, "CUR_GEN", 0)
+    monkeypatch.setattr(flappybird_game, "MODEL_PATH", str(tmp_path / "best_bird.fbm"))
+    return flappybird_game
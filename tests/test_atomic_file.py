@@ -0,0 +1,35 @@
+# Tests for atomic_write, which every saved file (models, traces, checkpoints and the fitness cache) is written through
+import gzip
+from functools import partial
+
+import pytest
+
+from atomic_file import atomic_write
+
+# The file only appears under its real name once it has been written completely
+def test_file_appears_once_written(tmp_path):
+    path = str(tmp_path / "bird.fbm")
+    with atomic_write(path) as f:
+        f.write(b"FBNN")
+        assert not (tmp_path / "bird.fbm").exists()
+    assert (tmp_path / "bird.fbm").read_bytes() == b"FBNN"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["bird.fbm"]
+
+# A save that fails halfway keeps the previous file and leaves no temporary file behind
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("[]")
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path), "w") as f:
+            f.write("[[")
+            raise RuntimeError("interrupted")
+    assert path.read_text() == "[]"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cache.json"]
+
+# Any opener can be used, e.g. gzip.open for checkpoints
+def test_file_written_with_another_opener(tmp_path):
+    path = str(tmp_path / "checkpoint-1")
+    with atomic_write(path, "w", partial(gzip.open, compresslevel=5)) as f:
+        f.write(b"population")
+    with gzip.open(path) as f:
+        assert f.read() == b"population"
@@ -0,0 +1,49 @@
+# Tests for BatchNetwork, which must give every network the outputs its own activate() gives
+import neat
+import numpy as np
+
+from batch_network import BatchNetwork
+
+# Returns the outputs of every network's own activate() on its row of inputs
+def activate_each(neural_networks, inputs):
+    return np.array([neural_network.activate(row) for neural_network, row in zip(neural_networks, inputs)])
+
+# Returns a feed-forward network for every genome
+def create(population, config):
+    return [neat.nn.FeedForwardNetwork.create(genome, config) for _, genome in population]
+
+# Mutated genomes have hidden nodes at different depths, disabled connections and deleted nodes, so every network is padded differently
+def test_batch_gives_the_outputs_of_activate(config, genomes):
+    neural_networks = create(genomes(200, 1, mutations=20), config)
+    assert len({len(neural_network.node_evals) for neural_network in neural_networks}) > 1
+    inputs = np.random.default_rng(1).uniform(-800, 800, (len(neural_networks), 3))
+
+    batch_network = BatchNetwork(neural_networks)
+    assert batch_network.fallback == []
+    assert len(batch_network.layers) > 1
+    np.testing.assert_allclose(batch_network.activate(inputs), activate_each(neural_networks, inputs), rtol=1e-12, atol=1e-12)
+
+# Only the selected networks are activated, in the order they are selected, as fly_flock does once birds start dying
+def test_batch_activates_the_selected_rows(config, genomes):
+    neural_networks = create(genomes(50, 2, mutations=12), config)
+    rows = np.array([41, 3, 17, 0, 49])
+    assert all(neural_networks[r].node_evals for r in rows) # None of the selected networks is dead, whose output is always 0
+    inputs = np.random.default_rng(2).uniform(-800, 800, (len(rows), 3))
+
+    outputs = BatchNetwork(neural_networks).activate(inputs, rows)
+    np.testing.assert_allclose(outputs, activate_each([neural_networks[r] for r in rows], inputs), rtol=1e-12, atol=1e-12)
+
+# Networks mixing activation functions apply each to the right nodes, and a network that cannot be padded falls back to its own activate()
+def test_batch_mixes_activations_and_falls_back(config, genomes):
+    config.genome_config.activation_options = ["tanh", "sigmoid", "relu"]
+    config.genome_config.activation_mutate_rate = 0.5
+    population = genomes(100, 3, mutations=20)
+    odd = next(i for i, neural_network in enumerate(create(population, config)) if neural_network.node_evals) # The first network that evaluates a node
+    population[odd][1].nodes[0].aggregation = "max" # Node 0 is the output node
+    neural_networks = create(population, config)
+    inputs = np.random.default_rng(3).uniform(-800, 800, (len(neural_networks), 3))
+
+    batch_network = BatchNetwork(neural_networks)
+    assert len(batch_network.activations) > 1
+    assert batch_network.fallback == [odd]
+    np.testing.assert_allclose(batch_network.activate(inputs), activate_each(neural_networks, inputs), rtol=1e-12, atol=1e-12)
@@ -0,0 +1,43 @@
+# Tests for saving and resuming training runs with AtomicCheckpointer
+import os
+import random
+
+import neat
+
+from checkpoint import AtomicCheckpointer
+
+# A fitness function that needs no flying: every genome gets a random fitness
+def random_fitness(genomes, config):
+    for _, genome in genomes:
+        genome.fitness = random.random()
+
+# Runs a fresh population for the given number of generations, saving a checkpoint after every one of them
+def train(config, prefix, generations):
+    random.seed(3)
+    population = neat.Population(config)
+    population.add_reporter(AtomicCheckpointer(1, None, prefix, lambda: {"cur_gen": population.generation + 1}))
+    population.run(random_fitness, generations)
+    return population
+
+# A checkpoint saved at the end of a generation holds the population bred for the next one, and is labelled with that generation
+def test_checkpoint_is_labelled_with_the_generation_it_holds(config, tmp_path):
+    prefix = str(tmp_path / "checkpoint-")
+    population = train(config, prefix, 3)
+    assert sorted(os.listdir(tmp_path)) == ["checkpoint-1", "checkpoint-2", "checkpoint-3", "neatconfig.txt"]
+
+    restored, state = AtomicCheckpointer.restore_checkpoint(prefix + "3")
+    assert restored.generation == population.generation == 3
+    assert sorted(restored.population) == sorted(population.population)
+    assert state == {"cur_gen": 3}
+
+# The children bred after resuming get new keys, so none of them replaces a genome that survived from the checkpoint
+def test_resumed_run_keeps_numbering_genomes(config, tmp_path):
+    prefix = str(tmp_path / "checkpoint-")
+    train(config, prefix, 2)
+
+    latest = max(name for name in os.listdir(tmp_path) if name.startswith("checkpoint-"))
+    restored, _ = AtomicCheckpointer.restore_checkpoint(str(tmp_path / latest))
+    saved = dict(restored.population)
+    restored.run(random_fitness, 1)
+    for key, genome in restored.population.items():
+        assert key > max(saved) or genome is saved.get(key)
@@ -0,0 +1,39 @@
+# Tests for FitnessCache, which must only ever give a genome the fitness it would have earned by flying
+from course import Course
+from evaluation import MultiCourseEvaluator
+from fitness_cache import FitnessCache
+
+# Makes the config fly every genome over 3 short courses, like --courses 3 --aggregate min --max-steps 300
+def multi_course(config):
+    config.course_seed = 5
+    config.course_seeds = Course.seeds(5, 3)
+    config.fitness_aggregate = "min"
+    config.max_course_steps = 300
+    return config
+
+# A genome that stopped flying early only has the fitness of the courses it flew, so it flies again rather than keeping that fitness
+def test_genomes_that_stopped_early_are_not_cached(config, genomes):
+    multi_course(config)
+    population = genomes(30, 4, mutations=3)
+    evaluator = MultiCourseEvaluator(top_k=3)
+    cache = FitnessCache()
+    fitness_function = cache.wrap(evaluator.evaluate, lambda: evaluator.stopped_early)
+
+    fitness_function(population, config)
+    stopped_early = evaluator.stopped_early
+    assert 0 < len(stopped_early) < len(population)
+    assert len(cache.entries) == len(population) - len(stopped_early)
+    full = {genome_id: genome.fitness for genome_id, genome in population if genome_id not in stopped_early}
+
+    fitness_function(population, config)
+    assert cache.hits == len(full)
+    assert cache.misses == len(population) + len(stopped_early)
+    assert all(genome.fitness == full[genome_id] for genome_id, genome in population if genome_id in full)
+
+# Without a way of telling which genomes stopped early, every fitness is cached, as it is for fitness functions that never stop early
+def test_every_fitness_is_cached_by_default(config, genomes):
+    multi_course(config)
+    population = genomes(10, 4)
+    cache = FitnessCache()
+    cache.wrap(MultiCourseEvaluator().evaluate)(population, config)
+    assert len(cache.entries) == len(population)
@@ -0,0 +1,45 @@
+# Tests for the vectorised flock, which must fly every bird exactly like the lock-step World does
+import numpy as np
+import pytest
+
+import flock
+from bird import Bird
+from pipe import Pipe
+from flock import Flock
+from sensors import Sensors
+
+# Returns the fitness gen_training gives each genome, flown by the lock-step World or by the vectorised flock
+def trained_fitness(training, config, population, vectorised):
+    training.VECTORISED_TRAINING = vectorised
+    training.gen_training(population, config)
+    return [genome.fitness for _, genome in population]
+
+# The whole flight of every bird is compared, from the first pipe to the last bird's crash, both with the flock flying every bird
+# to the end (no hand-over) and with its last birds handed over to a World
+@pytest.mark.parametrize("scalar_birds", [0, flock.SCALAR_BIRDS])
+@pytest.mark.parametrize("course_seed", [0, 7, 181])
+def test_flock_gives_the_world_fitness(training, config, genomes, monkeypatch, course_seed, scalar_birds):
+    monkeypatch.setattr(flock, "SCALAR_BIRDS", scalar_birds)
+    config.course_seed = course_seed
+    population = genomes(100, course_seed, mutations=3)
+    assert trained_fitness(training, config, population, True) == pytest.approx(trained_fitness(training, config, population, False))
+
+# Sensors other than the default ones are read from the flock's arrays rather than from Bird objects, and must read the same values
+def test_flock_gives_the_world_fitness_with_normalised_sensors(training, config, genomes, monkeypatch):
+    monkeypatch.setattr(flock, "SCALAR_BIRDS", 0)
+    Sensors(("y", "top", "bottom", "velocity", "distance", "next_gap"), normalise=True).configure(config)
+    config.course_seed = 3
+    population = genomes(100, 3, mutations=3)
+    assert trained_fitness(training, config, population, True) == pytest.approx(trained_fitness(training, config, population, False))
+
+# Every entry of every collision table is what the pixel masks say, at every horizontal offset where the pipe is level with the bird
+def test_collision_tables_match_the_masks():
+    bird_width, bird_height = Bird.MASKS[0].get_size()
+    pipe_width, pipe_height = Pipe.TOP_MASK.get_size()
+    for half, pipe_mask in enumerate((Pipe.TOP_MASK, Pipe.BOTTOM_MASK)):
+        for dx in range(1 - pipe_width, bird_width):
+            table = Flock.collision_table(half, dx)
+            assert table.shape == (len(Bird.MASKS), bird_height + pipe_height - 1)
+            for image, bird_mask in enumerate(Bird.MASKS):
+                expected = [bird_mask.overlap(pipe_mask, (dx, dy)) is not None for dy in range(1 - pipe_height, bird_height)]
+                assert np.array_equal(table[image], expected), (half, dx, image)
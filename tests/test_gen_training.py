@@ -0,0 +1,26 @@
+# Tests for gen_training, the fitness function of the lock-step and vectorised training paths
+import functools
+import os
+
+import neat
+
+from course import Course
+from flock import fly_flock
+
+# The last birds of a flock can die in the very step that takes the score past MAX_SCORE, leaving no survivor to save as the best bird.
+# With a MAX_SCORE of 0, the 5 birds of genome seed 149 all die while passing the first pipe of course 181
+def test_vectorised_generation_without_survivors(training, config, genomes, monkeypatch):
+    monkeypatch.setattr(training, "VECTORISED_TRAINING", True)
+    monkeypatch.setattr(training, "MAX_SCORE", 0)
+    monkeypatch.setattr(training, "fly_flock", functools.partial(fly_flock, max_score=0))
+    config.course_seed = 181
+    population = genomes(5, 149)
+
+    neural_networks = [neat.nn.FeedForwardNetwork.create(genome, config) for _, genome in population]
+    _, score, survivors = fly_flock(neural_networks, Course.get(181), max_score=0)
+    assert score > 0 and len(survivors) == 0
+
+    training.gen_training(population, config)
+    assert all(genome.fitness is not None for _, genome in population)
+    assert not os.path.exists(training.MODEL_PATH)
+    assert not training.GENERATION_STARTED
@@ -0,0 +1,28 @@
+# Tests for the migration between the islands of an island-model run
+import copy
+import queue
+import time
+
+import islands
+from islands import Island, NO_MORE_MIGRANTS
+
+# An island whose neighbour has stopped evolving takes in the migrants it sent before stopping, then never waits for it again
+def test_migrate_stops_waiting_for_a_finished_neighbour(config, genomes, monkeypatch):
+    monkeypatch.setattr(islands, "MIGRATION_TIMEOUT", 30)
+    population = genomes(6, 1)
+    for fitness, (_, genome) in enumerate(population):
+        genome.fitness = float(fitness)
+    migrants = [copy.deepcopy(genome) for _, genome in genomes(2, 2)]
+
+    inbox, outbox = queue.Queue(), queue.Queue()
+    inbox.put(migrants)
+    inbox.put(NO_MORE_MIGRANTS)
+    island = Island(0, [0], inbox, outbox, migration_every=1, migrants=2)
+
+    start = time.perf_counter()
+    for _ in range(3):
+        island.migrate(population, config)
+    assert time.perf_counter() - start < islands.MIGRATION_TIMEOUT / 2
+    assert island.received == 2
+    assert island.neighbour_done
+    assert outbox.qsize() == 3 # The island still sends its own migrants every time
@@ -0,0 +1,36 @@
+# Tests for loading saved birds, which never unpickles a file unless asked to
+import pickle
+
+import neat
+import pytest
+
+from model import Model, load_bird, save_model
+from replay import find_models
+
+# A network saved to a model file is loaded as a Model, and decides exactly like the network it was saved from
+def test_model_file_flies_like_its_network(config, genomes, tmp_path):
+    _, genome = genomes(1, 5, mutations=10)[0]
+    neural_network = neat.nn.FeedForwardNetwork.create(genome, config)
+    save_model(neural_network, str(tmp_path / "bird.fbm"))
+
+    model = load_bird(str(tmp_path / "bird.fbm"))
+    assert isinstance(model, Model)
+    for inputs in ([350.0, 120.0, 80.0], [10.0, 500.0, 300.0], [-5.0, 0.0, 700.0]):
+        assert model.activate(inputs) == pytest.approx(neural_network.activate(inputs))
+
+# A bird pickled by an older version of the game is only unpickled when that is explicitly allowed
+def test_pickled_bird_needs_allow_pickle(config, genomes, tmp_path):
+    _, genome = genomes(1, 5)[0]
+    path = tmp_path / "bird.pickle"
+    path.write_bytes(pickle.dumps(neat.nn.FeedForwardNetwork.create(genome, config)))
+
+    with pytest.raises(ValueError, match="not a model file"):
+        load_bird(str(path))
+    assert isinstance(load_bird(str(path), allow_pickle=True), neat.nn.FeedForwardNetwork)
+
+# The replay leaderboard only picks up the pickled birds of a folder when they are allowed
+def test_replay_only_finds_pickled_birds_if_allowed(tmp_path):
+    for name in ("a.fbm", "b.pickle", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    assert find_models(str(tmp_path)) == [str(tmp_path / "a.fbm")]
+    assert find_models(str(tmp_path), allow_pickle=True) == [str(tmp_path / "a.fbm"), str(tmp_path / "b.pickle")]